@@ -1,9 +1,39 @@
+"""
+Everything but the media widgets is imported eagerly. The names in `_LAZY` are
+loaded from their module on first access, so QtMultimedia and QtSvg are only
+imported by apps that use them: `from prmp_qt import CameraWidget` or `prmp_qt.media`.
+"""
+
+import importlib
+
 from .buttons import *
 from .windows import *
 from .frames import *
 from .labels import *
 from .scrollables import *
+from .tables import *
 from .editors import *
 from .radiobuttons import *
 from .svgs import *
-from .media import *
+
+_LAZY = {
+    "media": ".media",
+    "Camera": ".media.core",
+    "AUDIOWAVE": ".media.core",
+    "CameraWidget": ".media.widgets",
+    "QSvgRenderer": "PySide6.QtSvg",
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(_LAZY[name], __name__)
+    value = module if name == "media" else getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_LAZY})
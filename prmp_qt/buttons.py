@@ -22,13 +22,14 @@ class Button(QPushButton):
     ):
         super().__init__()
 
+        self._iconSize = iconSize
         self.iconColor = iconColor
         if text:
             self.setText(text)
-        if icon:
-            self.setIcon(icon, iconColor, composition)
         if iconSize:
             self.setIconSize(QSize(iconSize, iconSize))
+        if icon:
+            self.setIcon(icon, iconColor, composition)
         if clickable:
             self.setCursor(Qt.PointingHandCursor)
         if objectName:
@@ -40,6 +41,11 @@ class Button(QPushButton):
         self.setLayoutDirection(direction)
         self.setCheckable(checkable)
 
+    def svgIconSize(self) -> QSize:
+        # from the stored int, Icon hides iconSize() behind an int on IconButton
+        size = self._iconSize
+        return QSize(size, size) if size else None
+
     def setIcon(
         self,
         icon: Union[QIcon, str],
@@ -49,6 +55,7 @@ class Button(QPushButton):
         if not isinstance(icon, QIcon):
             icon = QSvgIcon(
                 icon,
+                size=self.svgIconSize(),
                 color=iconColor or self.iconColor,
                 composition=composition,
             )
@@ -61,7 +68,7 @@ class Button(QPushButton):
     ):
         icon = QSvgIcon(
             self.icon(),
-            size=self.iconSize(),
+            size=self.svgIconSize() or QPushButton.iconSize(self),
             color=iconColor,
             composition=composition,
         )
@@ -275,11 +282,7 @@ class Switch(QAbstractButton):
     def mouseReleaseEvent(self, event: QMoveEvent):
         super().mouseReleaseEvent(event)
         if event.button() == Qt.LeftButton:
-            anim = QPropertyAnimation(self, b"offset", self)
-            anim.setDuration(120)
-            anim.setStartValue(self.offset)
-            anim.setEndValue(self.next_offset)
-            anim.start()
+            ANIMATE(self, "offset", self.next_offset, duration=120)
 
     def enterEvent(self, event: QEnterEvent):
         self.setCursor(Qt.PointingHandCursor)
@@ -288,14 +291,46 @@ class Switch(QAbstractButton):
 
 class AvatarButton(Button):
     def __init__(
-        self, avatar: str = "", iconSize: int = 60, mask:int=50, icon:str='', iconColor:QColor=None,composition: SvgCompositions = SvgCompositions.SourceIn, **kwargs
+        self,
+        avatar: str = "",
+        iconSize: int = 60,
+        mask: int = 50,
+        icon: str = "",
+        iconColor: QColor = None,
+        composition: SvgCompositions = SvgCompositions.SourceIn,
+        asynchronous: bool = False,
+        **kwargs,
     ):
         super().__init__(iconSize=iconSize, **kwargs)
         self._icon = icon
         self._mask = mask
-        
+        self._avatarTask: PixmapRequest = None
+        self.asynchronous = asynchronous
+
         self.setAvatar(avatar, iconColor, composition)
 
-    def setAvatar(self, avatar: str, iconColor: QColor=None, composition: SvgCompositions = SvgCompositions.SourceIn):
+    def setAvatar(
+        self,
+        avatar: str,
+        iconColor: QColor = None,
+        composition: SvgCompositions = SvgCompositions.SourceIn,
+    ):
+        if self._avatarTask:
+            self._avatarTask.cancel()
+            self._avatarTask = None
+
+        if avatar and self.asynchronous:
+            # the icon stands in until the avatar is decoded and masked.
+            if self._icon:
+                self.setIcon(self._icon, iconColor, composition)
+            self._avatarTask = PIXMAP_ASYNC(
+                lambda pixmap: self.setIcon(QIcon(pixmap)),
+                avatar,
+                self._icon,
+                mask=self._mask,
+                context=self,
+            )
+            return
+
         icon = ICON(avatar, self._icon, mask=self._mask) if avatar else self._icon
         self.setIcon(icon, iconColor, composition)
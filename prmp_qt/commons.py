@@ -1,16 +1,95 @@
-import base64, math
+import base64, hashlib, itertools, math, os, tempfile, threading, time
+from collections import OrderedDict
 import PySide6
 from PySide6.QtGui import *
 from PySide6.QtCore import *
 from PySide6.QtWidgets import *
 from typing_extensions import *
 from typing import *
-from .qss import PrmpWindowQss
+from .qss import (
+    PrmpWindowQss,
+    THEMES,
+    THEME_PROPERTY,
+    DEFAULT_THEME,
+    THEMED_QSS,
+    THEMED_TYPES,
+    THEMED_NAMES,
+)
 
 WINDOW_TITLE_BAR_HEIGHT = 31
 
 
+def ANIMATION(
+    target: QObject, name: str, setter: Callable = None, duration: int = 250
+) -> QVariantAnimation:
+    """
+    The one animation of `target` driving `name`, created on first use: a
+    QPropertyAnimation of the Qt property `name`, or a QVariantAnimation passing its
+    values to `setter`.
+    """
+    animations = target.__dict__.setdefault("_prmpAnimations", {})
+    animation = animations.get(name)
+
+    if animation is None:
+        if setter:
+            animation = QVariantAnimation(target)
+            animation.valueChanged.connect(setter)
+        else:
+            animation = QPropertyAnimation(target, name.encode(), target)
+        animation.setDuration(duration)
+        animation.baseDuration = duration
+        animations[name] = animation
+
+    return animation
+
+
+def ANIMATE(
+    target: QObject,
+    name: str,
+    end: Any,
+    start: Any = None,
+    setter: Callable = None,
+    duration: int = None,
+    easing_curve: QEasingCurve = None,
+) -> QVariantAnimation:
+    """
+    Animates `name` of `target` to `end` with its ANIMATION.
+    A running animation is retargeted from its current value, reversing takes as long
+    as it already ran. Otherwise it starts from `start`, by default the current value
+    of the property.
+    """
+    animation = ANIMATION(target, name, setter)
+    if duration is not None:
+        animation.baseDuration = duration
+    if easing_curve is not None:
+        animation.setEasingCurve(easing_curve)
+
+    duration = animation.baseDuration
+    if animation.state() == QAbstractAnimation.Running:
+        if end == animation.endValue():
+            return animation
+
+        if end == animation.startValue():
+            duration = max(animation.currentTime(), 1)
+        start = animation.currentValue()
+        animation.stop()
+
+    elif start is None:
+        start = target.property(name) if setter is None else animation.endValue()
+
+    animation.setDuration(duration)
+    animation.setStartValue(start)
+    animation.setEndValue(end)
+    animation.start()
+    return animation
+
+
 class Expandable:
+    """
+    Animates the width between min_width and max_width with a single animation of
+    `expandedWidth`, setting the minimum and maximum width together every frame.
+    """
+
     def __init__(
         self: QWidget,
         max_width: int,
@@ -23,40 +102,86 @@ class Expandable:
         self.min_width = min_width
         self.max_width = max_width
 
-        self.animation_group = QParallelAnimationGroup(self)
+        self.animation_group = ANIMATION(
+            self, "expandedWidth", self.setExpandedWidth, duration=500
+        )
+        self.animation_group.setEasingCurve(easing_curve)
         self.animation_group.finished.connect(self.finished)
-        
-        self.__anim_group: list[QPropertyAnimation] = []
-
-        for prop in [b"minimumWidth", b"maximumWidth"]:
-            anim = QPropertyAnimation(self, prop)
-            anim.setDuration(500)
-            anim.setEasingCurve(easing_curve)
-            self.animation_group.addAnimation(anim)
-            self.__anim_group.append(anim)
 
         self.expanded = False
         self.setMinimumWidth(min_width)
         self.setMaximumWidth(min_width)
 
     def _anim_group(self):
-        return self.__anim_group
+        return [self.animation_group]
+
+    def setExpandedWidth(self: QWidget, width: int):
+        # the bound that lets the width change goes last, so it changes once
+        if width > self.maximumWidth():
+            self.setMaximumWidth(width)
+            self.setMinimumWidth(width)
+        else:
+            self.setMinimumWidth(width)
+            self.setMaximumWidth(width)
 
     def toggle(self: Union["Expandable", QWidget]):
-        for anim in self.__anim_group:
-            anim.setStartValue(self.max_width if self.expanded else self.min_width)
-            anim.setEndValue(self.min_width if self.expanded else self.max_width)
-        self.animation_group.start()
+        start = self.max_width if self.expanded else self.min_width
         self.expanded = not self.expanded
-    
+        ANIMATE(
+            self,
+            "expandedWidth",
+            self.max_width if self.expanded else self.min_width,
+            start=start,
+            setter=self.setExpandedWidth,
+        )
+
     def finished(self):
         ...
 
 
 class Icon:
-    def __init__(self: QWidget, iconSize: int, border=True, color_str: str = "black"):
+    """
+    Sizes and borders an icon widget. With SHARED_STYLE it is styled by a rule shared
+    by the icons of the same size, border and color, added once to the stylesheet of
+    the QApplication and matched by the `prmpIcon` property, instead of a stylesheet
+    per widget. New rules are applied with the other stylesheet changes of the event
+    loop tick.
+    """
+
+    SHARED_STYLE = True
+
+    def __init__(
+        self: QWidget, iconSize: int = 0, border=True, color_str: str = "black"
+    ):
+        if not iconSize:
+            # reached without arguments by the cooperative __init__ of the widget
+            return
+
         self.iconSize = iconSize
 
+        app = QApplication.instance()
+        if self.SHARED_STYLE and isinstance(app, QApplication):
+            key = f"{iconSize}-{int(border)}-{color_str}"
+            name = f"icon:{key}"
+            if name not in app.styleFragments:
+                app.add_style_sheet(
+                    f"""
+                    *[prmpIcon="{key}"] {{
+                        border: {int(border)}px solid {color_str};
+                        min-height: {iconSize}px;
+                        max-height: {iconSize}px;
+                        min-width: {iconSize}px;
+                        max-width: {iconSize}px;
+                        border-radius: 5px;
+                        padding: 2px;
+                    }}
+                    """,
+                    name,
+                )
+
+            self.setProperty("prmpIcon", key)
+            return
+
         self.setStyleSheet(
             f"""
             border: {int(border)}px solid {color_str};
@@ -75,12 +200,159 @@ _QApplication = QApplication
 
 
 class QApplication(_QApplication):
-    def __init__(self, args: list = []):
+    """
+    Styles the application with PrmpWindowQss followed by the stylesheet fragments
+    added by name. Any count of changes in an event loop tick ends in one
+    setStyleSheet, identical fragments are applied once and every application wide
+    restyle is timed, reported by `restyled` in milliseconds.
+
+    Passing `theme` (a key of THEMES) or calling `setTheme` installs the stylesheet
+    holding every theme variant, after which switching themes only changes the
+    palette and the `prmpTheme` property of the top level windows.
+    """
+
+    restyled = Signal(float)
+    themeChanged = Signal(str, float)
+
+    def __init__(self, args: list = [], theme: str = None):
         super().__init__(args)
-        self.setStyleSheet(PrmpWindowQss)
 
-    def add_style_sheet(self, qss: str):
-        self.setStyleSheet(PrmpWindowQss + qss)
+        self.baseStyleSheet = PrmpWindowQss
+        self.styleFragments: dict[str, str] = {}
+        self.restyleTimes: list[float] = []
+
+        self.theme = DEFAULT_THEME
+        self.themeTimes: list[float] = []
+
+        self._styleSheet = ""
+        self._styleSheetPending = False
+        self._palettes: dict[str, QPalette] = {DEFAULT_THEME: self.palette()}
+        self._themedClasses: dict[type, bool] = {}
+        self.applyStyleSheet()
+
+        if theme:
+            self.setTheme(theme)
+
+    def add_style_sheet(self, qss: str, name: str = None):
+        "Adds or replaces the fragment `name`, unnamed fragments are named by content."
+        if name is None:
+            name = hashlib.blake2b(qss.encode(), digest_size=8).hexdigest()
+
+        if self.styleFragments.get(name) != qss:
+            self.styleFragments[name] = qss
+            self.scheduleStyleSheet()
+
+    def remove_style_sheet(self, name: str):
+        if self.styleFragments.pop(name, None) is not None:
+            self.scheduleStyleSheet()
+
+    def setBaseStyleSheet(self, qss: str):
+        if qss != self.baseStyleSheet:
+            self.baseStyleSheet = qss
+            self.scheduleStyleSheet()
+
+    def compiledStyleSheet(self) -> str:
+        parts = dict.fromkeys([self.baseStyleSheet, *self.styleFragments.values()])
+        return "\n".join(parts)
+
+    def scheduleStyleSheet(self):
+        if not self._styleSheetPending:
+            self._styleSheetPending = True
+            QTimer.singleShot(0, self.applyStyleSheet)
+
+    def applyStyleSheet(self):
+        "Sets the compiled stylesheet now if it changed, see `scheduleStyleSheet`."
+        self._styleSheetPending = False
+
+        qss = self.compiledStyleSheet()
+        if qss == self._styleSheet:
+            return
+
+        start = time.perf_counter()
+        self.setStyleSheet(qss)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        self._styleSheet = qss
+        self.restyleTimes.append(elapsed)
+        self.restyled.emit(elapsed)
+
+    def themePalette(self, name: str) -> QPalette:
+        if name not in self._palettes:
+            palette = QPalette(self._palettes[DEFAULT_THEME])
+            for role, color in (THEMES[name]["palette"] or {}).items():
+                palette.setColor(getattr(QPalette.ColorRole, role), QColor(color))
+            self._palettes[name] = palette
+
+        return self._palettes[name]
+
+    def setTheme(self, name: str) -> float:
+        """
+        Switches every top level window to the theme `name` and returns the time taken
+        in milliseconds. Only the first switch sets a stylesheet. Later ones repolish
+        every widget when the palette changes, as widgets styled by a stylesheet keep
+        the palette they were polished with, otherwise just the widgets whose rules
+        differ between the themes. While a theme other than the default is on,
+        windows opened later get it when first polished.
+        """
+        palette = self.themePalette(name)
+        repalette = palette != self.themePalette(self.theme)
+        start = time.perf_counter()
+
+        self.setBaseStyleSheet(THEMED_QSS)
+        self.applyStyleSheet()
+
+        self.theme = name
+        self.setPalette(palette)
+        for window in self.topLevelWidgets():
+            self.polishTheme(window, repalette)
+
+        # windows without the property are styled by the default rules already
+        if name == DEFAULT_THEME:
+            self.removeEventFilter(self)
+        else:
+            self.installEventFilter(self)
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.themeTimes.append(elapsed)
+        self.themeChanged.emit(name, elapsed)
+        return elapsed
+
+    def isThemed(self, widget: QWidget) -> bool:
+        "Whether the rules matching `widget` depend on the theme."
+        if widget.objectName() in THEMED_NAMES:
+            return True
+
+        cls = type(widget)
+        if cls not in self._themedClasses:
+            self._themedClasses[cls] = any(map(widget.inherits, THEMED_TYPES))
+        return self._themedClasses[cls]
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        # any new top level window, polished before its children are
+        if (
+            event.type() == QEvent.Polish
+            and watched.isWidgetType()
+            and watched.isWindow()
+            and watched.property(THEME_PROPERTY) is None
+        ):
+            watched.setProperty(THEME_PROPERTY, self.theme)
+        return False
+
+    def polishTheme(self, window: QWidget, repalette: bool = False):
+        """
+        Moves `window` to the current theme, repolishing its themed widgets, or all of
+        them with `repalette` after a palette change.
+        """
+        if window.property(THEME_PROPERTY) == self.theme and not repalette:
+            return
+
+        window.setProperty(THEME_PROPERTY, self.theme)
+        for widget in itertools.chain([window], window.findChildren(QWidget)):
+            if repalette or self.isThemed(widget):
+                style = widget.style()
+                style.unpolish(widget)
+                style.polish(widget)
+                widget.update()
 
 
 class QFlowLayout(QLayout):
@@ -93,25 +365,106 @@ class QFlowLayout(QLayout):
         self.setSpacing(spacing)
 
         self._items = []
-        self.__pending_positions = {}
+        self._clearCache()
+
+    def _clearCache(self):
+        "Forgets the size hints, spacings, heights and geometries of the items."
+        self._metrics: list[tuple] = None
+        self._minimumSize: QSize = None
+        self._heights: dict[int, int] = {}
+        self._geometries: list[tuple] = []
+        self._rect: tuple = None
+
+    def invalidate(self):
+        self._clearCache()
+        super().invalidate()
 
     def __del__(self):
-        item = self.takeAt(0)
-        while item:
-            item = self.takeAt(0)
+        self._items.clear()
 
     def addItem(self, a0: QLayoutItem) -> None:
-        try:
-            position = self.__pending_positions[a0.widget()]
-            self._items.insert(position, a0)
-            del self.__pending_positions[a0.widget()]
-        except KeyError:
-            self._items.append(a0)
+        self._clearCache()
+        self._items.append(a0)
 
     def addWidget(self, w: QWidget, position: int = None) -> None:
-        if position:
-            self.__pending_positions[w] = position
-        super().addWidget(w)
+        if position is None:
+            super().addWidget(w)
+        else:
+            self.insertWidgets([(position, w)])
+
+    def insertWidgets(self, widgets: Iterable[tuple[int, QWidget]]) -> None:
+        """
+        Inserts many widgets with one relayout, `widgets` are (position, widget) pairs
+        whose positions are indexes in the resulting layout.
+        """
+        parent = self.parentWidget()
+        enabled = self.isEnabled()
+        # a disabled layout is not activated by every child shown
+        self.setEnabled(False)
+
+        pairs = []
+        for position, w in widgets:
+            self.addChildWidget(w)
+            pairs.append((position, QWidgetItem(w)))
+
+            explicitlyHidden = w.isHidden() and w.testAttribute(
+                Qt.WA_WState_ExplicitShowHide
+            )
+            if parent and parent.isVisible() and not explicitlyHidden:
+                w.show()
+
+        self._items = self._mergeItems(self._items, pairs)
+        self.setEnabled(enabled)
+        self.invalidate()
+
+    def removeWidgets(self, widgets: Iterable[QWidget], delete: bool = True) -> None:
+        "Removes many widgets with one relayout, deleting them unless `delete` is False."
+        widgets = set(widgets)
+        kept = []
+
+        for item in self._items:
+            w = item.widget()
+            if w in widgets:
+                if delete:
+                    w.deleteLater()
+            else:
+                kept.append(item)
+
+        self._items = kept
+        self.invalidate()
+
+    def moveWidgets(self, widgets: Iterable[tuple[int, QWidget]]) -> None:
+        "Moves many widgets of the layout with one relayout, pairs as in insertWidgets."
+        positions = {w: position for position, w in widgets}
+        kept = []
+        moved = []
+
+        for item in self._items:
+            position = positions.get(item.widget())
+            if position is None:
+                kept.append(item)
+            else:
+                moved.append((position, item))
+
+        self._items = self._mergeItems(kept, moved)
+        self.invalidate()
+
+    def moveWidget(self, w: QWidget, position: int) -> None:
+        self.moveWidgets([(position, w)])
+
+    def _mergeItems(
+        self, items: list[QLayoutItem], pairs: list[tuple[int, QLayoutItem]]
+    ) -> list[QLayoutItem]:
+        "`items` with the (position, item) `pairs` inserted, in one pass."
+        items = iter(items)
+        merged = []
+
+        for position, item in sorted(pairs, key=lambda pair: pair[0]):
+            merged.extend(itertools.islice(items, max(0, position - len(merged))))
+            merged.append(item)
+
+        merged.extend(items)
+        return merged
 
     def count(self):
         return len(self._items)
@@ -129,10 +482,15 @@ class QFlowLayout(QLayout):
         return True
 
     def heightForWidth(self, width):
-        height = self._doLayout(QRect(0, 0, width, 0), True)
+        height = self._heights.get(width)
+        if height is None:
+            height = self._heights[width] = self._doLayout(QRect(0, 0, width, 0), True)
         return height
 
     def minimumSize(self):
+        if self._minimumSize is not None:
+            return QSize(self._minimumSize)
+
         size = QSize()
 
         for item in self._items:
@@ -141,57 +499,87 @@ class QFlowLayout(QLayout):
         margin, _, _, _ = self.getContentsMargins()
 
         size += QSize(2 * margin, 2 * margin)
+        self._minimumSize = QSize(size)
         return size
 
     def removeItem(self, a0: QLayoutItem) -> None:
-        a0.widget().deleteLater()
+        if a0.widget():
+            self.removeWidgets([a0.widget()])
+        elif a0 in self._items:
+            self._items.remove(a0)
+            self.invalidate()
 
     def removeWidget(self, w: QWidget) -> None:
-        w.deleteLater()
+        self.removeWidgets([w])
 
     def setGeometry(self, rect):
         super().setGeometry(rect)
-        self._doLayout(rect, False)
+
+        if rect.getRect() != self._rect:
+            self._doLayout(rect, False)
+            self._rect = rect.getRect()
 
     def sizeHint(self):
         return self.minimumSize()
 
     def takeAt(self, index: int) -> QLayoutItem:
         if 0 <= index < len(self._items):
+            self._clearCache()
             return self._items.pop(index)
 
         return None
 
+    def _itemMetrics(self) -> list[tuple]:
+        "The (width, height, space_x, space_y) of every item, kept until invalidated."
+        if self._metrics is None:
+            spacing = self.spacing()
+            spaces = {}
+            self._metrics = []
+
+            for item in self._items:
+                wid = item.widget()
+                style = wid.style() if wid else QApplication.style()
+                if style not in spaces:
+                    spaces[style] = tuple(
+                        spacing
+                        + style.layoutSpacing(
+                            QSizePolicy.PushButton, QSizePolicy.PushButton, orientation
+                        )
+                        for orientation in (Qt.Horizontal, Qt.Vertical)
+                    )
+
+                hint = item.sizeHint()
+                self._metrics.append((hint.width(), hint.height(), *spaces[style]))
+
+        return self._metrics
+
     def _doLayout(self, rect, testOnly):
         """This does the layout. Dont ask me how. Source: https://github.com/baoboa/pyqt5/blob/master/examples/layouts/flowlayout.py"""
         x = rect.x()
         y = rect.y()
+        right = rect.right()
         line_height = 0
+        geometries = []
 
-        for item in self._items:
-            wid = item.widget()
-            space_x = self.spacing() + wid.style().layoutSpacing(
-                QSizePolicy.PushButton,
-                QSizePolicy.PushButton,
-                Qt.Horizontal,
-            )
-            space_y = self.spacing() + wid.style().layoutSpacing(
-                QSizePolicy.PushButton,
-                QSizePolicy.PushButton,
-                Qt.Vertical,
-            )
-            next_x = x + item.sizeHint().width() + space_x
-            if next_x - space_x > rect.right() and line_height > 0:
+        for width, height, space_x, space_y in self._itemMetrics():
+            next_x = x + width + space_x
+            if next_x - space_x > right and line_height > 0:
                 x = rect.x()
                 y = y + line_height + space_y
-                next_x = x + item.sizeHint().width() + space_x
+                next_x = x + width + space_x
                 line_height = 0
 
-            if not testOnly:
-                item.setGeometry(QRect(QPoint(x, y), item.sizeHint()))
+            geometries.append((x, y, width, height))
 
             x = next_x
-            line_height = max(line_height, item.sizeHint().height())
+            line_height = max(line_height, height)
+
+        if not testOnly:
+            previous = self._geometries
+            for index, (item, geometry) in enumerate(zip(self._items, geometries)):
+                if index >= len(previous) or previous[index] != geometry:
+                    item.setGeometry(QRect(*geometry))
+            self._geometries = geometries
 
         return y + line_height - rect.y()
 
@@ -235,7 +623,12 @@ def B64_DECODE_TO_STRING(str_decoded: Union[str, bytes]) -> str:
     return B64_DECODE(str_decoded).decode()
 
 
-def MASK_IMAGE(image: QImage, size=128) -> QImage:
+def DEVICE_PIXEL_RATIO() -> float:
+    screen = QGuiApplication.primaryScreen()
+    return screen.devicePixelRatio() if screen else 1.0
+
+
+def MASK_IMAGE(image: QImage, size=128, dpr: float = None) -> QImage:
     image = image.convertToFormat(QImage.Format_ARGB32)
 
     imgsize = min(image.width(), image.height())
@@ -257,7 +650,7 @@ def MASK_IMAGE(image: QImage, size=128) -> QImage:
     painter.end()
 
     _image = out_img.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-    _image.setDevicePixelRatio(QWindow().devicePixelRatio())
+    _image.setDevicePixelRatio(dpr or DEVICE_PIXEL_RATIO())
 
     return _image
 
@@ -341,15 +734,315 @@ def ROUND_IMAGE(image: Union[QImage, str], radius: int, rect: QRectF) -> QImage:
     return out_img
 
 
-def IMAGE(
-    image_data: Union[str, int],
+def IMAGE_COST(value: Union[QImage, QPixmap, QIcon]) -> int:
+    "Approximate number of bytes held by an image, pixmap or icon."
+    if isinstance(value, QImage):
+        return value.sizeInBytes()
+    if isinstance(value, QPixmap):
+        return value.width() * value.height() * max(value.depth(), 8) // 8
+    if isinstance(value, QIcon):
+        return sum(size.width() * size.height() * 4 for size in value.availableSizes())
+    return 0
+
+
+class PixmapCache:
+    """
+    A size bounded LRU cache of images, pixmaps and icons.
+
+    Entries are evicted least recently used first once the total cost in bytes
+    goes over `maxBytes`. Cached values are shared, treat them as read-only.
+    """
+
+    def __init__(self, maxBytes: int = 64 * 1024 * 1024):
+        self.maxBytes = maxBytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[tuple, tuple[Any, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._entries
+
+    def get(self, key: tuple, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: tuple, value, cost: int = None):
+        self.remove(key)
+
+        cost = IMAGE_COST(value) if cost is None else cost
+        if cost > self.maxBytes:
+            return value
+
+        self._entries[key] = value, cost
+        self.bytes += cost
+        self.evict()
+        return value
+
+    def remove(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self.bytes -= entry[1]
+
+    def evict(self, maxBytes: int = None):
+        maxBytes = self.maxBytes if maxBytes is None else maxBytes
+        while self._entries and self.bytes > maxBytes:
+            _, (_, cost) = self._entries.popitem(last=False)
+            self.bytes -= cost
+
+    def setMaxBytes(self, maxBytes: int):
+        self.maxBytes = maxBytes
+        self.evict()
+
+    def invalidate(self, match: Callable[[tuple], bool] = None):
+        "Removes the entries whose key satisfies `match`, or every entry."
+        if match is None:
+            self.clear()
+            return
+
+        for key in [key for key in self._entries if match(key)]:
+            self.remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        return dict(
+            entries=len(self._entries),
+            bytes=self.bytes,
+            maxBytes=self.maxBytes,
+            hits=self.hits,
+            misses=self.misses,
+        )
+
+
+PIXMAP_CACHE = PixmapCache()
+
+
+def IMAGE_SOURCE_KEY(image_data: Union[str, bytes], image: str) -> tuple:
+    """
+    Identifies the source of an image, a digest of `image_data` or the `image` path
+    with its modification time. Returns None if the source can not be identified.
+    """
+    if image_data:
+        if isinstance(image_data, str):
+            image_data = image_data.encode()
+        return "data", hashlib.blake2b(image_data, digest_size=16).hexdigest()
+
+    if isinstance(image, str) and image:
+        try:
+            mtime = os.stat(image).st_mtime_ns
+        except OSError:
+            mtime = None
+        return "path", image, mtime
+
+
+def IMAGE_KEY(
+    kind: str,
+    image_data: Union[str, bytes],
     image: str,
     mask=0,
     scale: QSize = None,
     round: int = 0,
     rect: QRect = None,
-) -> QPixmap:
+) -> tuple:
+    source = IMAGE_SOURCE_KEY(image_data, image)
+    if source is None:
+        return None
+
+    return (
+        kind,
+        source,
+        scale.toTuple() if scale else None,
+        round,
+        rect.getRect() if (round and rect) else None,
+        mask,
+        DEVICE_PIXEL_RATIO(),
+    )
+
+
+def INVALIDATE_IMAGE(image_data: Union[str, bytes] = None, image: str = None):
+    """
+    Drops the cached images, pixmaps and icons built from `image_data` or the `image` path,
+    or the whole cache if neither is given.
+    """
+    if not (image_data or image):
+        PIXMAP_CACHE.clear()
+        return
+
+    source = IMAGE_SOURCE_KEY(image_data, image)[:2]
+    PIXMAP_CACHE.invalidate(lambda key: key[1][:2] == source)
+
+
+class ImageDiskCache:
+    """
+    An optional persistent cache of processed (masked or rounded) images, stored as
+    PNG files named after a digest of the source content and the processing parameters.
+
+    Files are pruned least recently used first once the directory grows over `maxBytes`.
+    Disabled until a directory is set.
+
+    IMAGE_DISK_CACHE.setDirectory(".cache/avatars", maxBytes=50 * 1024 * 1024)
+    """
+
+    # Bump when the processing done by MASK_IMAGE or ROUND_IMAGE changes.
+    VERSION = 1
+
+    def __init__(self, directory: str = "", maxBytes: int = 128 * 1024 * 1024):
+        self.directory = ""
+        self.maxBytes = maxBytes
+        self.bytes = 0
+        # puts come from the QThreadPool through PIXMAP_ASYNC
+        self._lock = threading.RLock()
+
+        if directory:
+            self.setDirectory(directory, maxBytes)
+
+    def setDirectory(self, directory: str, maxBytes: int = None):
+        "Enables the cache in `directory`, an empty `directory` disables it."
+        if maxBytes is not None:
+            self.maxBytes = maxBytes
+
+        with self._lock:
+            self.directory = directory
+            self.bytes = 0
+            if not directory:
+                return
+
+            os.makedirs(directory, exist_ok=True)
+            self.bytes = sum(stat.st_size for _, stat in self._files())
+            self.prune()
+
+    def _files(self) -> list[tuple[str, os.stat_result]]:
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".png"):
+                    files.append((entry.path, entry.stat()))
+        return files
+
+    def key(self, image_data: Union[str, bytes], image: str, **params) -> str:
+        if image_data:
+            data = image_data.encode() if isinstance(image_data, str) else image_data
+        else:
+            try:
+                with open(image, "rb") as file:
+                    data = file.read()
+            except (OSError, TypeError):
+                return None
+
+        digest = hashlib.blake2b(data, digest_size=20)
+        digest.update(repr((self.VERSION, sorted(params.items()))).encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.png")
+
+    def get(self, key: str) -> QImage:
+        path = self.path(key)
+        image = QImage(path)
+        if image.isNull():
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            ...
+        return image
+
+    def put(self, key: str, image: QImage):
+        path = self.path(key)
+        try:
+            handle, temp = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+            os.close(handle)
+        except OSError:
+            return
+
+        # a temp file per write, concurrent puts of one key never share it
+        saved = image.save(temp, "PNG")
+        with self._lock:
+            try:
+                if not saved:
+                    raise OSError
+                replaced = os.path.getsize(path) if os.path.exists(path) else 0
+                os.replace(temp, path)
+                self.bytes += os.path.getsize(path) - replaced
+            except OSError:
+                try:
+                    os.remove(temp)
+                except OSError:
+                    ...
+                return
+
+            if self.bytes > self.maxBytes:
+                self.prune()
+
+    def prune(self, maxBytes: int = None):
+        "Removes the least recently used files until the directory fits in `maxBytes`."
+        maxBytes = self.maxBytes if maxBytes is None else maxBytes
+        with self._lock:
+            if self.bytes <= maxBytes:
+                return
+
+            files = sorted(self._files(), key=lambda file: file[1].st_mtime)
+            self.bytes = sum(stat.st_size for _, stat in files)
+
+            for path, stat in files:
+                if self.bytes <= maxBytes:
+                    break
+                try:
+                    os.remove(path)
+                    self.bytes -= stat.st_size
+                except OSError:
+                    ...
+
+    def clear(self):
+        if self.directory:
+            self.prune(0)
+
+
+IMAGE_DISK_CACHE = ImageDiskCache()
+
+
+def _LOAD_IMAGE(
+    image_data: Union[str, bytes],
+    image: str,
+    mask=0,
+    scale: QSize = None,
+    round: int = 0,
+    rect: QRect = None,
+    dpr: float = None,
+) -> QImage:
     _image = None
+    dpr = dpr or DEVICE_PIXEL_RATIO()
+
+    key = None
+    if IMAGE_DISK_CACHE.directory and (mask or (round and rect)):
+        key = IMAGE_DISK_CACHE.key(
+            image_data,
+            image,
+            mask=mask,
+            scale=scale.toTuple() if scale else None,
+            round=round,
+            rect=rect.getRect() if (round and rect) else None,
+            dpr=dpr,
+        )
+        _image = IMAGE_DISK_CACHE.get(key) if key else None
+        if _image is not None:
+            if mask:
+                _image.setDevicePixelRatio(dpr)
+            return _image
 
     if image_data:
         image_data = (
@@ -369,14 +1062,216 @@ def IMAGE(
         _image = ROUND_IMAGE(_image, round, rect)
 
     if mask:
-        _image = MASK_IMAGE(_image, mask)
+        _image = MASK_IMAGE(_image, mask, dpr)
+
+    if key and not _image.isNull():
+        IMAGE_DISK_CACHE.put(key, _image)
 
     return _image
 
 
-def PIXMAP(*args, **kwargs) -> QPixmap:
-    image = IMAGE(*args, **kwargs)
-    return QPixmap(image)
+def _CACHED_IMAGE(kind: str, build: Callable, cache: bool, *args, **kwargs):
+    key = IMAGE_KEY(kind, *args, **kwargs) if cache else None
+    if key is None:
+        return build(*args, **kwargs)
+
+    value = PIXMAP_CACHE.get(key)
+    if value is None:
+        value = PIXMAP_CACHE.put(key, build(*args, **kwargs))
+    return value
+
+
+def IMAGE(
+    image_data: Union[str, bytes],
+    image: str,
+    mask=0,
+    scale: QSize = None,
+    round: int = 0,
+    rect: QRect = None,
+    cache: bool = True,
+) -> QImage:
+    image = _CACHED_IMAGE(
+        "image", _LOAD_IMAGE, cache, image_data, image, mask, scale, round, rect
+    )
+    # QImage is implicitly shared, the copy detaches only if it is modified.
+    return QImage(image)
+
+
+def _LOAD_PIXMAP(*args, **kwargs) -> QPixmap:
+    return QPixmap(_LOAD_IMAGE(*args, **kwargs))
+
+
+def PIXMAP(
+    image_data: Union[str, bytes],
+    image: str,
+    mask=0,
+    scale: QSize = None,
+    round: int = 0,
+    rect: QRect = None,
+    cache: bool = True,
+) -> QPixmap:
+    return _CACHED_IMAGE(
+        "pixmap", _LOAD_PIXMAP, cache, image_data, image, mask, scale, round, rect
+    )
+
+
+class _ThreadTaskSignals(QObject):
+    finished = Signal(object)
+    failed = Signal(object)
+
+
+class ThreadTask(QRunnable):
+    """
+    Runs `function(*args, **kwargs)` on a QThreadPool, its result is delivered through
+    the `finished` signal on the thread that created the task.
+    A cancelled task never emits.
+    """
+
+    def __init__(self, function: Callable, *args, **kwargs):
+        super().__init__()
+
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = False
+
+        self.signals = _ThreadTaskSignals()
+        self.finished = self.signals.finished
+        self.failed = self.signals.failed
+
+    def run(self):
+        if self.cancelled:
+            return
+
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as error:
+            if not self.cancelled:
+                self.failed.emit(error)
+            return
+
+        if not self.cancelled:
+            self.finished.emit(result)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def start(self, pool: QThreadPool = None) -> "ThreadTask":
+        (pool or QThreadPool.globalInstance()).start(self)
+        return self
+
+
+class PixmapRequest:
+    """
+    A PIXMAP_ASYNC call waiting for its pixmap. Cancelling drops the result, and the
+    shared decode too once every request waiting on it is cancelled.
+    """
+
+    def __init__(self, task: ThreadTask, callback: Callable, context: QObject = None):
+        self.task = task
+        self.callback = callback
+        self.context = context
+        self.cancelled = False
+
+        task.requests.append(self)
+        if context is not None:
+            context.destroyed.connect(self.contextDestroyed)
+
+    def release(self):
+        "Disconnects from `context`, which would otherwise keep the request alive."
+        if self.context is not None:
+            try:
+                self.context.destroyed.disconnect(self.contextDestroyed)
+            except (RuntimeError, TypeError):
+                ...
+            self.context = None
+
+    def contextDestroyed(self):
+        # nothing to disconnect from a context being destroyed
+        self.context = None
+        self.cancel()
+
+    def cancel(self):
+        if self.cancelled:
+            return
+
+        self.cancelled = True
+        self.release()
+
+        task = self.task
+        if all(request.cancelled for request in task.requests):
+            task.cancel()
+            _PIXMAP_TASKS.pop(task.key, None)
+
+    def deliver(self, pixmap: QPixmap):
+        if not self.cancelled:
+            self.release()
+            self.callback(pixmap)
+
+
+# decodes in flight by IMAGE_KEY, requests of the same image share one
+_PIXMAP_TASKS: dict[tuple, ThreadTask] = {}
+
+
+def PIXMAP_ASYNC(
+    callback: Callable[[QPixmap], None],
+    image_data: Union[str, bytes],
+    image: str,
+    mask=0,
+    scale: QSize = None,
+    round: int = 0,
+    rect: QRect = None,
+    context: QObject = None,
+) -> PixmapRequest:
+    """
+    PIXMAP, with the decoding, scaling, rounding and masking done on the global QThreadPool.
+
+    `callback` receives the pixmap on the GUI thread, right away on a cache hit in which
+    case None is returned. Otherwise a PixmapRequest is returned, cancel it to drop its
+    result. The request is cancelled when `context` is destroyed. Requests of an image
+    already being decoded wait for that decode.
+    """
+    args = image_data, image, mask, scale, round, rect
+    key = IMAGE_KEY("pixmap", *args)
+
+    pixmap = PIXMAP_CACHE.get(key) if key else None
+    if pixmap is not None:
+        callback(pixmap)
+        return None
+
+    task = _PIXMAP_TASKS.get(key) if key else None
+    if task is not None:
+        return PixmapRequest(task, callback, context)
+
+    # QImage can be built off the GUI thread, QPixmap and the caches can not.
+    task = ThreadTask(_LOAD_IMAGE, *args, dpr=DEVICE_PIXEL_RATIO())
+    task.key = key
+    task.requests = []
+
+    def finished(image: QImage):
+        if _PIXMAP_TASKS.get(key) is task:
+            del _PIXMAP_TASKS[key]
+
+        pixmap = QPixmap(image)
+        if key:
+            PIXMAP_CACHE.put(key, pixmap)
+        for request in task.requests:
+            request.deliver(pixmap)
+
+    def failed(_):
+        if _PIXMAP_TASKS.get(key) is task:
+            del _PIXMAP_TASKS[key]
+        for request in task.requests:
+            request.release()
+
+    task.finished.connect(finished)
+    task.failed.connect(failed)
+    request = PixmapRequest(task, callback, context)
+    if key:
+        _PIXMAP_TASKS[key] = task
+
+    task.start()
+    return request
 
 
 def ROUND_PIXMAP(*args, **kwargs) -> QPixmap:
@@ -384,9 +1279,19 @@ def ROUND_PIXMAP(*args, **kwargs) -> QPixmap:
     return QPixmap(image)
 
 
-def ICON(*args, **kwargs) -> QIcon:
-    pixmap = PIXMAP(*args, **kwargs)
-    return QIcon(pixmap)
+def ICON(
+    image_data: Union[str, bytes],
+    image: str,
+    mask=0,
+    scale: QSize = None,
+    round: int = 0,
+    rect: QRect = None,
+    cache: bool = True,
+) -> QIcon:
+    build = lambda *args: QIcon(PIXMAP(*args, cache=cache))
+    return _CACHED_IMAGE(
+        "icon", build, cache, image_data, image, mask, scale, round, rect
+    )
 
 
 def ROUND_ICON(*args, **kwargs) -> QIcon:
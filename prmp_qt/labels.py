@@ -18,11 +18,14 @@ class ImageLabel(Label):
         objectName: str = "",
         default: str = "",
         radius: int = 0,
+        asynchronous: bool = False,
     ):
         super().__init__(objectName=objectName)
 
         self.radius = radius
         self.default = default
+        self.asynchronous = asynchronous
+        self._imageTask: PixmapRequest = None
         self.setScaledContents(True)
 
         if default:
@@ -34,6 +37,21 @@ class ImageLabel(Label):
         image: Union[QImage, str] = None,
         image_data: str = "",
     ):
+        if self._imageTask:
+            self._imageTask.cancel()
+            self._imageTask = None
+
+        if image_data and self.asynchronous:
+            # the default image stands in until image_data is decoded.
+            self.setPixmap(PIXMAP("", self.default) if self.default else QPixmap())
+            self._imageTask = PIXMAP_ASYNC(
+                self.setPixmap,
+                image_data,
+                self.default,
+                round=self.radius,
+                context=self,
+            )
+            return
 
         pixmap = PIXMAP(image_data, self.default, round=self.radius)
 
@@ -59,7 +77,7 @@ class IconLabel(Label, Icon):
     ):
         Label.__init__(self, parent=parent, objectName=objectName)
         Icon.__init__(self, icon_size, border=border, **kwargs)
-        self.setPixmap(QSvgPixmap(icon, color).scaled(self.icon_size, self.icon_size))
+        self.setPixmap(QSvgPixmap(icon, color, size=QSize(icon_size, icon_size)))
 
 
 class ColorfulTag(Label):
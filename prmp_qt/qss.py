@@ -1,5 +1,7 @@
+import itertools, re
+
 RADIUS = 20
-PrmpWindowQss = f"""
+PrmpWindowQssTemplate = """
 #window_frame {{
   background-color: palette(Window);
 }}
@@ -20,15 +22,15 @@ PrmpWindowQss = f"""
   border-top-left-radius: 5px;
   border-top-right-radius: 5px;
   background-color: palette(Window);
-  height: {RADIUS+10}px;
+  height: {title_height}px;
 }}
 
 #btnClose, #btnMaximize, #btnMinimize {{
-  min-width: {RADIUS}px;
-  min-height: {RADIUS}px;
-  max-width: {RADIUS}px;
-  max-height: {RADIUS}px;
-  border-radius: {RADIUS/2}px;
+  min-width: {radius}px;
+  min-height: {radius}px;
+  max-width: {radius}px;
+  max-height: {radius}px;
+  border-radius: {radius_half}px;
   margin: 4px;
 }}
 
@@ -78,7 +80,7 @@ QLabel#bold {{
 }}
 
 #required {{
-    color: red;
+    color: {required};
     text-align: top center;
 }}
 
@@ -107,7 +109,7 @@ ColorfulTag#red {{
 }}
 
 QScrollBar:vertical {{
-    background: white;
+    background: {scrollbar};
     width: 8px;
 }}
 
@@ -133,15 +135,15 @@ TextButton, LinkButton {{
 }}
 
 LinkButton#blue_link {{
-    color: blue;
+    color: {link};
 }}
 
 LinkButton#blue_link:hover {{
-    color: #005583;
+    color: {link_hover};
 }}
 
 LinkButton#blue_link:pressed {{
-    color: black;
+    color: {link_pressed};
 }}
 
 IconButton, IconTextButton {{
@@ -157,11 +159,11 @@ IconButton, IconTextButton {{
 }}
 
 IconButton:hover {{
-    background-color: #d6e7ef;
+    background-color: {hover};
 }}
 
 IconButton:pressed {{
-    background-color: #c5d5dc;
+    background-color: {pressed};
 }}
 
 IconTextButton {{
@@ -172,12 +174,12 @@ IconTextButton {{
 }}
 
 LinkButton:hover, IconTextButton:hover {{
-    color: #005583;
-    background-color: #d6e7ef;
+    color: {link_hover};
+    background-color: {hover};
 }}
 
 LinkButton:pressed, IconTextButton:pressed {{
-    color: #00334f;
+    color: {hover_pressed};
 }}
 
 LinkButton#left {{
@@ -188,11 +190,11 @@ LinkButton#left {{
 IconTextButton#blue, TextButton {{
     font-family: Roboto;
     font-weight: bold;
-    color: white;
+    color: {accent_text};
     padding: 5px;
     padding-left: 15px;
     padding-right: 15px;
-    background-color: blue;
+    background-color: {accent};
 }}
 
 LinkIconButton {{
@@ -201,27 +203,27 @@ LinkIconButton {{
     font-weight: bold;
     padding-right: 30px;
     background-repeat: no-repeat;
-    color: #30aff2;
+    color: {link_icon};
 }}
 
 IconTextButton#blue:hover, TextButton:hover {{
-    background-color: #0089d3;
+    background-color: {accent_hover};
 }}
 
 IconTextButton#blue:pressed, TextButton:pressed {{
-    background-color: #006da7;
+    background-color: {accent_pressed};
 }}
 
 IconTextButton#red, TextButton#red {{
-    background-color: #d8214d;
+    background-color: {danger};
 }}
 
 IconTextButton#red:hover, TextButton#red:hover {{
-    background-color: #b01b40;
+    background-color: {danger_hover};
 }}
 
 IconTextButton#red:pressed, TextButton#red:pressed {{
-    background-color: #6a1027;
+    background-color: {danger_pressed};
 }}
 
 TextButton#cancel {{
@@ -293,3 +295,180 @@ TextIcon {{
 }}
 
 """
+
+THEME_PROPERTY = "prmpTheme"
+DEFAULT_THEME = "light"
+
+LIGHT_THEME = dict(
+    radius=RADIUS,
+    title_height=RADIUS + 10,
+    radius_half=RADIUS / 2,
+    required="red",
+    scrollbar="white",
+    link="blue",
+    link_hover="#005583",
+    link_pressed="black",
+    hover="#d6e7ef",
+    pressed="#c5d5dc",
+    hover_pressed="#00334f",
+    accent="blue",
+    accent_text="white",
+    accent_hover="#0089d3",
+    accent_pressed="#006da7",
+    danger="#d8214d",
+    danger_hover="#b01b40",
+    danger_pressed="#6a1027",
+    link_icon="#30aff2",
+    # None keeps the palette the application started with
+    palette=None,
+)
+
+DARK_THEME = dict(
+    LIGHT_THEME,
+    required="#ff6b6b",
+    scrollbar="#2b2b2b",
+    link="#6cb6ff",
+    link_hover="#9ccfff",
+    link_pressed="white",
+    hover="#3a4a52",
+    pressed="#46585f",
+    hover_pressed="#cfe8ff",
+    accent="#2f6fdf",
+    accent_hover="#3d82f0",
+    accent_pressed="#2559b5",
+    danger="#c4304f",
+    danger_hover="#d8476a",
+    danger_pressed="#8f1f38",
+    link_icon="#5cc4ff",
+    palette=dict(
+        Window="#202124",
+        WindowText="#e8eaed",
+        Base="#2b2b2b",
+        AlternateBase="#323232",
+        Text="#e8eaed",
+        Button="#303134",
+        ButtonText="#e8eaed",
+        Midlight="#3c3c3c",
+        Highlight="#2f6fdf",
+        HighlightedText="white",
+        ToolTipBase="#303134",
+        ToolTipText="#e8eaed",
+        PlaceholderText="#9aa0a6",
+        Link="#6cb6ff",
+    ),
+)
+
+HIGH_CONTRAST_THEME = dict(
+    LIGHT_THEME,
+    required="#ff4040",
+    scrollbar="black",
+    link="yellow",
+    link_hover="cyan",
+    link_pressed="white",
+    hover="#3a3a00",
+    pressed="#5a5a00",
+    hover_pressed="yellow",
+    accent="yellow",
+    accent_text="black",
+    accent_hover="#ffff66",
+    accent_pressed="white",
+    danger="#ff4040",
+    danger_hover="#ff7070",
+    danger_pressed="#ffa0a0",
+    link_icon="cyan",
+    palette=dict(
+        Window="black",
+        WindowText="white",
+        Base="black",
+        AlternateBase="#1a1a1a",
+        Text="white",
+        Button="black",
+        ButtonText="white",
+        Midlight="#7f7f7f",
+        Highlight="#1aebff",
+        HighlightedText="black",
+        ToolTipBase="black",
+        ToolTipText="yellow",
+        PlaceholderText="#c0c0c0",
+        Link="yellow",
+    ),
+)
+
+THEMES = {
+    "light": LIGHT_THEME,
+    "dark": DARK_THEME,
+    "high-contrast": HIGH_CONTRAST_THEME,
+}
+
+
+def THEME_QSS(theme: dict) -> str:
+    return PrmpWindowQssTemplate.format(**theme)
+
+
+def QSS_RULES(qss: str) -> list:
+    "Splits a flat stylesheet into (selectors, body) pairs."
+    return [
+        (selectors.strip(), body)
+        for selectors, body in re.findall(r"([^{}]+)\{([^{}]*)\}", qss)
+    ]
+
+
+def THEMED_RULES(theme: dict) -> list:
+    "The rules of `theme` that differ from the ones of the default theme."
+    return [
+        rule
+        for rule, default in zip(
+            QSS_RULES(THEME_QSS(theme)), QSS_RULES(THEME_QSS(THEMES[DEFAULT_THEME]))
+        )
+        if rule != default
+    ]
+
+
+def SCOPED_QSS(name: str, theme: dict) -> str:
+    "The themed rules of `theme` restricted to windows whose theme property is `name`."
+    scope = f'*[{THEME_PROPERTY}="{name}"] '
+    return "\n".join(
+        ", ".join(scope + selector.strip() for selector in selectors.split(","))
+        + f" {{{body}}}"
+        for selectors, body in THEMED_RULES(theme)
+    )
+
+
+def THEME_SELECTORS() -> tuple:
+    """
+    The type and object names styled differently across the themes, either by their
+    tokens or by palette() references, as (types, objectNames).
+    """
+    selectors = {
+        selectors
+        for name, theme in THEMES.items()
+        for selectors, _ in THEMED_RULES(theme)
+    }
+    selectors.update(
+        selectors for selectors, body in QSS_RULES(PrmpWindowQss) if "palette(" in body
+    )
+
+    types, names = set(), set()
+    for selector in itertools.chain.from_iterable(s.split(",") for s in selectors):
+        subject = selector.split()[-1].split(":")[0]
+        type_, _, name = subject.partition("#")
+        if type_ and type_ != "*":
+            types.add(type_)
+        if name:
+            names.add(name)
+
+    return types, names
+
+
+PrmpWindowQss = THEME_QSS(LIGHT_THEME)
+
+# every variant compiled once, switching themes never parses a new stylesheet
+THEMED_QSS = "\n".join(
+    [PrmpWindowQss]
+    + [
+        SCOPED_QSS(name, theme)
+        for name, theme in THEMES.items()
+        if name != DEFAULT_THEME
+    ]
+)
+THEMED_TYPES, THEMED_NAMES = THEME_SELECTORS()
@@ -1,4 +1,7 @@
+import bisect, contextlib, csv, datetime, decimal, heapq, io, itertools, json
+import locale, numbers, os, random, struct, time
 from .frames import *
+from .labels import Label
 
 
 class Scrollable(QScrollArea):
@@ -75,17 +78,210 @@ class SearchableItem:
     def search(self, text: str) -> bool:
         return False
 
+    def searchKeys(self) -> list[str]:
+        "The strings an indexed SearchableList matches queries against."
+        return []
+
 
 SearchableItems = list[SearchableItem]
 
 
+class SearchIndex:
+    """
+    An inverted n-gram index of the case folded search keys of items.
+
+    Modes of `search`:
+        contains: items with a key containing the query.
+        prefix: items with, for every word of the query, a word starting with it.
+        fuzzy: items sharing at least `fuzziness` of the n-grams of the query.
+    """
+
+    MODES = "contains", "prefix", "fuzzy"
+
+    def __init__(self, n: int = 3, fuzziness: float = 0.6):
+        self.n = n
+        self.fuzziness = fuzziness
+
+        self.keys: dict[Any, list[str]] = {}
+        self.grams: dict[str, set] = {}
+        self.words: dict[str, set] = {}
+        self._sortedWords: list[str] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, item) -> bool:
+        return item in self.keys
+
+    def ngrams(self, text: str) -> set[str]:
+        n = self.n
+        return {text[i : i + n] for i in range(max(1, len(text) - n + 1))}
+
+    def add(self, item, keys: Iterable[str]):
+        if item in self.keys:
+            self.remove(item)
+
+        keys = [key.casefold() for key in keys if key]
+        self.keys[item] = keys
+
+        for key in keys:
+            for gram in self.ngrams(key):
+                self.grams.setdefault(gram, set()).add(item)
+            for word in key.split():
+                self.words.setdefault(word, set()).add(item)
+        self._sortedWords = None
+
+    def remove(self, item):
+        keys = self.keys.pop(item, None)
+        if keys is None:
+            return
+
+        for key in keys:
+            for gram in self.ngrams(key):
+                self._discard(self.grams, gram, item)
+            for word in key.split():
+                self._discard(self.words, word, item)
+        self._sortedWords = None
+
+    def _discard(self, postings: dict[str, set], key: str, item):
+        items = postings.get(key)
+        if items is not None:
+            items.discard(item)
+            if not items:
+                del postings[key]
+
+    def clear(self):
+        self.keys.clear()
+        self.grams.clear()
+        self.words.clear()
+        self._sortedWords = None
+
+    def update(self, items: Iterable, keys: Callable[[Any], Iterable[str]]):
+        for item in items:
+            self.add(item, keys(item))
+
+    def search(self, text: str, mode: str = "contains") -> set:
+        assert mode in self.MODES, f"mode must be one of {self.MODES}"
+
+        text = text.casefold().strip()
+        if not text:
+            return set(self.keys)
+
+        return getattr(self, f"_{mode}")(text)
+
+    def _contains(self, text: str) -> set:
+        if len(text) < self.n:
+            postings = [items for gram, items in self.grams.items() if text in gram]
+            return set().union(*postings)
+
+        postings = sorted(
+            (self.grams.get(gram, ()) for gram in self.ngrams(text)), key=len
+        )
+        candidates = set(postings[0]).intersection(*postings[1:])
+
+        return {
+            item for item in candidates if any(text in key for key in self.keys[item])
+        }
+
+    def _prefix(self, text: str) -> set:
+        if self._sortedWords is None:
+            self._sortedWords = sorted(self.words)
+        words = self._sortedWords
+
+        matches = None
+        for part in text.split():
+            items = set()
+            index = bisect.bisect_left(words, part)
+            while index < len(words) and words[index].startswith(part):
+                items.update(self.words[words[index]])
+                index += 1
+
+            matches = items if matches is None else matches & items
+            if not matches:
+                break
+
+        return matches
+
+    def _fuzzy(self, text: str) -> set:
+        if len(text) < self.n:
+            return self._contains(text)
+
+        grams = self.ngrams(text)
+        needed = max(1, math.ceil(len(grams) * self.fuzziness))
+
+        counts: dict[Any, int] = {}
+        for gram in grams:
+            for item in self.grams.get(gram, ()):
+                counts[item] = counts.get(item, 0) + 1
+
+        return {item for item, count in counts.items() if count >= needed}
+
+    def matchKeys(self, keys: list[str], text: str, mode: str = "contains") -> bool:
+        "Whether the case folded `keys` of a single item match the case folded `text`."
+        if mode == "prefix":
+            words = [word for key in keys for word in key.split()]
+            return all(
+                any(word.startswith(part) for word in words) for part in text.split()
+            )
+
+        if mode == "fuzzy" and len(text) >= self.n:
+            grams = self.ngrams(text)
+            needed = max(1, math.ceil(len(grams) * self.fuzziness))
+            found = set().union(*(self.ngrams(key) for key in keys))
+            return len(grams & found) >= needed
+
+        return any(text in key for key in keys)
+
+    def searchSnapshot(
+        self, snapshot: list[tuple[Any, list[str]]], text: str, mode: str = "contains"
+    ) -> set:
+        """
+        Like `search`, over a snapshot of (item, case folded keys) pairs instead of the
+        index, so it can run on another thread while the index changes.
+        """
+        text = text.casefold().strip()
+        if not text:
+            return {item for item, _ in snapshot}
+
+        return {item for item, keys in snapshot if self.matchKeys(keys, text, mode)}
+
+
 class SearchableList(Scrollable):
-    def __init__(self, reverse: bool = False, **kwargs):
+    def __init__(
+        self,
+        reverse: bool = False,
+        incremental: bool = False,
+        indexed: bool = False,
+        searchMode: str = "contains",
+        searchDelay: int = 0,
+        threaded: bool = False,
+        **kwargs,
+    ):
         super().__init__(VFrame, **kwargs)
 
         self.items: SearchableItems = []
         self.reverse = reverse
 
+        # incremental search assumes that extending a query can only narrow its matches.
+        self.incremental = incremental
+        self._query = ""
+        self._matches: set[SearchableItem] = set()
+        self._order: SearchableItems = None
+
+        # indexed search matches queries against the SearchableItem.searchKeys of items.
+        self.index = SearchIndex() if indexed else None
+        self.searchMode = searchMode
+
+        # threaded search matches a snapshot of the searchKeys of items on a QThreadPool.
+        self.threaded = threaded
+        self.searchDelay = searchDelay
+        self._pendingQuery = ""
+        self._searchTask: ThreadTask = None
+
+        self._searchTimer = QTimer(self)
+        self._searchTimer.setSingleShot(True)
+        self._searchTimer.timeout.connect(self.searchPending)
+
         m = 2
         self.widgetLayout().setContentsMargins(m, m, m, m)
         self.widgetLayout().setSpacing(m)
@@ -117,6 +313,10 @@ class SearchableList(Scrollable):
     def addItem(self, item: SearchableItem, alignment: Qt.Alignment = Qt.AlignCenter):
         self.add(item)
         self.items.append(item)
+        self._matches.add(item)
+        self._order = None
+        if self.index is not None:
+            self.index.add(item, item.searchKeys())
 
     def remove(self, item: SearchableItem):
         assert isinstance(item, SearchableItem)
@@ -126,7 +326,12 @@ class SearchableList(Scrollable):
         self.remove(item)
         if item in self.items:
             self.items.remove(item)
-            
+        self._matches.discard(item)
+        if self._order and item in self._order:
+            self._order.remove(item)
+        if self.index is not None:
+            self.index.remove(item)
+
         self.widget().update()
         self.update()
 
@@ -145,28 +350,134 @@ class SearchableList(Scrollable):
                 self.remove(item)
 
     def search(self, text: str):
+        if self.incremental:
+            self.searchIncremental(text)
+            return
+
         self.clear()
 
+        matches = None
+        if self.index is not None:
+            matches = self.index.search(text, self.searchMode)
+
+        visible = set()
+
         item: QWidget
         for item in self.items:
-            if text:
+            if matches is not None:
+                valid = item in matches
+            elif text:
                 valid = item.search(text)
             else:
                 valid = True
 
             item.setVisible(valid)
+            if valid:
+                visible.add(item)
 
+        self._matches = visible
         self.fill(self.items)
 
+    def matchItems(self, text: str) -> set[SearchableItem]:
+        "The items matching `text`, refining the last matches when `text` extends the last query."
+        if not text:
+            return set(self.items)
+
+        if self.index is not None:
+            return self.index.search(text, self.searchMode)
+
+        if self._query and text.startswith(self._query):
+            candidates = self._matches
+        else:
+            candidates = self.items
+
+        return {item for item in candidates if item.search(text)}
+
+    def searchIncremental(self, text: str):
+        """
+        Toggles the visibility of only the items whose match state changed since the
+        last query, and re-orders the layout only when `arrange_items` output changed.
+        """
+        self.applyMatches(text, self.matchItems(text))
+
+    def applyMatches(self, text: str, matches: set[SearchableItem]):
+        item: QWidget
+        for item in self._matches.symmetric_difference(matches):
+            item.setVisible(item in matches)
+
+        self._matches = matches
+        self._query = text
+
+        if self.arrange_items(self.items) != self._order:
+            self.clear()
+            self.fill(self.items)
+
+    def scheduleSearch(self, text: str):
+        "A slot for textChanged, searching once typing pauses for `searchDelay` ms."
+        self._pendingQuery = text
+        if self.searchDelay:
+            self._searchTimer.start(self.searchDelay)
+        else:
+            self.searchPending()
+
+    def searchPending(self):
+        if self.threaded:
+            self.searchThreaded(self._pendingQuery)
+        else:
+            self.search(self._pendingQuery)
+
+    def searchKeysSnapshot(self) -> list[tuple[SearchableItem, list[str]]]:
+        if self.index is not None:
+            return list(self.index.keys.items())
+
+        return [
+            (item, [key.casefold() for key in item.searchKeys()]) for item in self.items
+        ]
+
+    def searchThreaded(self, text: str):
+        """
+        Matches `text` against a snapshot of the searchKeys of items on a worker thread,
+        then applies only the visibility changes on the GUI thread.
+        Results of a query superseded by a newer one are discarded.
+        """
+        if self._searchTask:
+            self._searchTask.cancel()
+            self.destroyed.disconnect(self._searchTask.cancel)
+
+        matcher = SearchIndex() if self.index is None else self.index
+        task = ThreadTask(
+            matcher.searchSnapshot, self.searchKeysSnapshot(), text, self.searchMode
+        )
+
+        def finished(matches: set[SearchableItem]):
+            # a result queued before the list was destroyed must not touch it
+            if task.cancelled or task is not self._searchTask:
+                return
+
+            self.destroyed.disconnect(task.cancel)
+            self._searchTask = None
+            self.applyMatches(text, matches)
+
+        task.finished.connect(finished)
+        self.destroyed.connect(task.cancel)
+        self._searchTask = task.start()
+
     def fill(self, items: SearchableItems):
         items = self.arrange_items(items)
 
         for item in reversed(items):
             self.widgetLayout().insertWidget(0, item)
 
+        self._order = list(items)
+
     def fillItems(self, items: SearchableItems):
         self.fill(items)
         self.items = items
+        self._matches = set(items)
+
+        if self.index is not None:
+            self.index.clear()
+            self.index.update(items, lambda item: item.searchKeys())
 
     def arrange_items(self, items: SearchableItems) -> SearchableItems:
         "A method to customized the order of the search, it can be override in subclasses"
@@ -174,6 +485,353 @@ class SearchableList(Scrollable):
 
 
 
+class VirtualSearchableList(Scrollable):
+    """
+    A SearchableList for very long lists, the items are plain data and only a small
+    pool of row widgets covering the viewport (plus `overscan` rows) is created,
+    rebinding them to items as the list scrolls.
+
+    Subclasses override `createRow` and `bindRow`, and `itemHeight` for rows of
+    varying heights.
+    """
+
+    def __init__(
+        self,
+        reverse: bool = False,
+        rowHeight: int = 40,
+        overscan: int = 4,
+        spacing: int = 2,
+        **kwargs,
+    ):
+        super().__init__(Frame, **kwargs)
+
+        self.items: list = []
+        self.reverse = reverse
+        self.rowHeight = rowHeight
+        self.overscan = overscan
+        self.spacing = spacing
+        self.text = ""
+
+        self._shown: list = []
+        self._visible: list = []
+        self._offsets: list[int] = [0]
+        self._rows: list[QWidget] = []
+        self._refreshPending = False
+
+        self.verticalScrollBar().valueChanged.connect(self.updateRows)
+
+    @property
+    def arranged_items(self) -> list:
+        return self.arrange_items(self.items)
+
+    def createRow(self) -> QWidget:
+        "Creates a row widget of the pool, it is rebound to items with `bindRow`."
+        return Label()
+
+    def bindRow(self, row: QWidget, item):
+        row.setText(str(item))
+
+    def itemHeight(self, item) -> int:
+        return self.rowHeight
+
+    def matches(self, item, text: str) -> bool:
+        if isinstance(item, SearchableItem) or hasattr(item, "search"):
+            return item.search(text)
+        return text.lower() in str(item).lower()
+
+    def add(self, item):
+        "Shows `item` without adding it to the searchable items."
+        self._shown.append(item)
+        self.scheduleRefresh()
+
+    def addItem(self, item):
+        self.items.append(item)
+        self.scheduleRefresh()
+
+    def remove(self, item):
+        if item in self._shown:
+            self._shown.remove(item)
+        self.scheduleRefresh()
+
+    def removeItem(self, item):
+        if item in self.items:
+            self.items.remove(item)
+        self.remove(item)
+
+    def deleteItem(self, item):
+        self.removeItem(item)
+
+    def deleteItems(self):
+        self.items = []
+        self.clear()
+
+    def clear(self):
+        self._shown = []
+        self.scheduleRefresh()
+
+    def search(self, text: str):
+        self.text = text
+        self.refresh()
+
+    def fill(self, items: list):
+        self._shown = list(items)
+        self.scheduleRefresh()
+
+    def fillItems(self, items: list):
+        self.items = items
+        self._shown = []
+        self.scheduleRefresh()
+
+    def arrange_items(self, items: list) -> list:
+        "A method to customized the order of the search, it can be override in subclasses"
+        return items
+
+    def scheduleRefresh(self):
+        "Coalesces many additions or removals into one refresh on the next event loop tick."
+        if not self._refreshPending:
+            self._refreshPending = True
+            QTimer.singleShot(0, self.refresh)
+
+    def refresh(self):
+        self._refreshPending = False
+
+        text = self.text
+        visible = [
+            item
+            for item in self.arrange_items(self.items)
+            if not text or self.matches(item, text)
+        ]
+        visible.extend(self._shown)
+        if self.reverse:
+            visible.reverse()
+        self._visible = visible
+
+        spacing = self.spacing
+        heights = (self.itemHeight(item) + spacing for item in visible)
+        self._offsets = list(itertools.accumulate(heights, initial=spacing))
+
+        self._widget.setMinimumHeight(self._offsets[-1])
+        for row in self._rows:
+            row._item = None
+        self.updateRows()
+
+    def rowsTop(self) -> int:
+        "The top of the first row, reversed lists stick to the bottom when shorter than the viewport."
+        if self.reverse:
+            return max(0, self.viewport().height() - self._offsets[-1])
+        return 0
+
+    def updateRows(self, *_):
+        offsets = self._offsets
+        visible = self._visible
+        top = self.rowsTop()
+
+        scroll = self.verticalScrollBar().value() - top
+        height = self.viewport().height()
+
+        first = max(0, bisect.bisect_right(offsets, scroll) - 1 - self.overscan)
+        last = min(
+            len(visible), bisect.bisect_left(offsets, scroll + height) + self.overscan
+        )
+
+        while len(self._rows) < last - first:
+            row = self.createRow()
+            row.setParent(self._widget)
+            row._item = None
+            self._rows.append(row)
+
+        width = self._widget.width() - self.spacing * 2
+        for index, row in enumerate(self._rows):
+            position = first + index
+            if position >= last:
+                row.hide()
+                continue
+
+            item = visible[position]
+            if row._item is not item:
+                self.bindRow(row, item)
+                row._item = item
+
+            y = offsets[position]
+            h = offsets[position + 1] - y - self.spacing
+            row.setGeometry(self.spacing, top + y, width, h)
+            row.show()
+
+    def resizeEvent(self, event: QResizeEvent):
+        super().resizeEvent(event)
+        self.updateRows()
+
+
+class VirtualFlow(Scrollable):
+    """
+    A FFrame for thousands of chips, the items are plain data flowed into lines of
+    `lineHeight` from their cached widths and only the chips of the visible lines
+    (plus `overscan` lines) are created, from a pool rebound to items as the flow
+    scrolls.
+
+    The line breaks come from the prefix sums of the widths, a bisect per line.
+    Subclasses override `createChip` and `bindChip`, and `itemWidth` for chips not
+    sized by their text.
+    """
+
+    def __init__(
+        self,
+        lineHeight: int = 30,
+        spacing: int = 6,
+        padding: int = 24,
+        overscan: int = 2,
+        **kwargs,
+    ):
+        super().__init__(Frame, **kwargs)
+
+        self.items: list = []
+        self.lineHeight = lineHeight
+        self.spacing = spacing
+        self.padding = padding
+        self.overscan = overscan
+
+        self._widths: list[int] = []
+        self._prefix: list[int] = [0]
+        self._lines: list[int] = [0]
+        self._chips: list[QWidget] = []
+        self._bound: dict[int, QWidget] = {}
+        self._layoutWidth = -1
+        self._refreshPending = False
+
+        self.verticalScrollBar().valueChanged.connect(self.updateChips)
+
+    def createChip(self) -> QWidget:
+        "Creates a chip of the pool, it is rebound to items with `bindChip`."
+        return Label()
+
+    def bindChip(self, chip: QWidget, item):
+        chip.setText(str(item))
+
+    def itemWidth(self, item) -> int:
+        return self.fontMetrics().horizontalAdvance(str(item)) + self.padding
+
+    def fill(self, items: list):
+        self.items = list(items)
+        self._widths = [self.itemWidth(item) for item in self.items]
+        self.scheduleRefresh()
+
+    def addItems(self, items: list):
+        self.insertItems(len(self.items), items)
+
+    def addItem(self, item):
+        self.insertItems(len(self.items), [item])
+
+    def insertItems(self, index: int, items: list):
+        self.items[index:index] = items
+        self._widths[index:index] = [self.itemWidth(item) for item in items]
+        self.scheduleRefresh()
+
+    def removeItem(self, item):
+        if item in self.items:
+            index = self.items.index(item)
+            del self.items[index], self._widths[index]
+            self.scheduleRefresh()
+
+    def clear(self):
+        self.fill([])
+
+    def invalidateWidths(self):
+        "Measures every item again, after a font or style change."
+        self.fill(self.items)
+
+    def scheduleRefresh(self):
+        "Coalesces many additions or removals into one refresh on the next event loop tick."
+        if not self._refreshPending:
+            self._refreshPending = True
+            QTimer.singleShot(0, self.refresh)
+
+    def refresh(self):
+        self._refreshPending = False
+
+        spacing = self.spacing
+        self._prefix = list(
+            itertools.accumulate((width + spacing for width in self._widths), initial=0)
+        )
+        self.layoutLines()
+
+    def layoutLines(self):
+        "Breaks the items into lines fitting the viewport width."
+        prefix = self._prefix
+        count = len(self.items)
+        self._layoutWidth = self.viewport().width()
+        bound = self._layoutWidth - self.spacing
+
+        lines = []
+        start = 0
+        while start < count:
+            lines.append(start)
+            end = bisect.bisect_right(prefix, prefix[start] + bound) - 1
+            start = max(end, start + 1)
+        lines.append(count)
+        self._lines = lines
+
+        step = self.lineHeight + self.spacing
+        self._widget.setMinimumHeight((len(lines) - 1) * step + self.spacing)
+        self.updateChips()
+
+    def updateChips(self, *_):
+        if self.viewport().width() != self._layoutWidth:
+            # the vertical scroll bar showed or hid
+            return self.layoutLines()
+
+        items = self.items
+        lines = self._lines
+        prefix = self._prefix
+        spacing = self.spacing
+
+        step = self.lineHeight + spacing
+        scroll = self.verticalScrollBar().value()
+        height = self.viewport().height()
+
+        count = len(lines) - 1
+        firstLine = min(count, max(0, scroll // step - self.overscan))
+        lastLine = min(count, (scroll + height) // step + 1 + self.overscan)
+        first, last = lines[firstLine], lines[lastLine]
+
+        bound = {
+            index: chip for index, chip in self._bound.items() if first <= index < last
+        }
+        used = set(bound.values())
+        free = [chip for chip in self._chips if chip not in used]
+
+        for line in range(firstLine, lastLine):
+            start = lines[line]
+            y = spacing + line * step
+
+            for index in range(start, lines[line + 1]):
+                item = items[index]
+                chip = bound.get(index)
+                if chip is None:
+                    chip = bound[index] = free.pop() if free else self._newChip()
+                if chip._item is not item:
+                    self.bindChip(chip, item)
+                    chip._item = item
+
+                x = spacing + prefix[index] - prefix[start]
+                chip.setGeometry(x, y, self._widths[index], self.lineHeight)
+                chip.show()
+
+        for chip in free:
+            chip.hide()
+        self._bound = bound
+
+    def _newChip(self) -> QWidget:
+        chip = self.createChip()
+        chip.setParent(self._widget)
+        chip._item = None
+        self._chips.append(chip)
+        return chip
+
+    def resizeEvent(self, event: QResizeEvent):
+        super().resizeEvent(event)
+        self.updateChips()
+
+
 class TableItem:
     def __init__(
         self,
@@ -238,7 +896,830 @@ class TableHeaderItem(TableItem):
 SPLITTER = TableHeaderItem("█")
 
 
-class Table(QTableWidget):
+class TableColumnStyle:
+    """
+    The font, brushes, flags and alignment of the cells of a column, derived once from
+    its TableHeaderItem. Fonts and brushes are interned, so every cell of every table
+    shares the same objects.
+    """
+
+    _fonts: dict[tuple, QFont] = {}
+    _brushes: dict[int, QBrush] = {}
+
+    def __init__(self, header: TableHeaderItem):
+        self.header = header
+        self.splitter = header is SPLITTER
+        self.alignment = Qt.AlignCenter
+
+        self.foreground = self.background = None
+        if header.colorItems:
+            self.foreground = self.brush(header.itemsForeground)
+            self.background = self.brush(header.itemsBackground)
+
+        if self.splitter:
+            self.flags = Qt.NoItemFlags
+        elif header.editableColumns:
+            self.flags = Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
+        else:
+            self.flags = Qt.ItemIsSelectable | Qt.ItemIsEnabled
+
+        self.font = self.internFont(8) if self.splitter else None
+        self.boldFont = self.internFont(12, bold=True)
+        self.headerFont = self.internFont(8 if self.splitter else 12, bold=True)
+
+        self._prototypes: dict[bool, QTableWidgetItem] = {}
+
+    @classmethod
+    def internFont(cls, pointSize: int, bold: bool = False) -> QFont:
+        key = pointSize, bold
+        font = cls._fonts.get(key)
+        if font is None:
+            font = cls._fonts[key] = QFont()
+            font.setPointSize(pointSize)
+            font.setBold(bold)
+        return font
+
+    @classmethod
+    def brush(cls, color: Union[Qt.GlobalColor, QColor]) -> QBrush:
+        if color is None:
+            return None
+
+        key = QColor(color).rgba()
+        brush = cls._brushes.get(key)
+        if brush is None:
+            brush = cls._brushes[key] = QBrush(QColor(color))
+        return brush
+
+    def prototype(self, bold: bool = False) -> QTableWidgetItem:
+        "An item carrying the style of the column, cells are copies of it."
+        item = self._prototypes.get(bold)
+        if item is None:
+            item = self._prototypes[bold] = QTableWidgetItem()
+            if self.splitter:
+                item.setText(self.header.text)
+            if self.foreground:
+                item.setForeground(self.foreground)
+            if self.background:
+                item.setBackground(self.background)
+            if bold:
+                item.setFont(self.boldFont)
+            elif self.font:
+                item.setFont(self.font)
+            item.setFlags(self.flags)
+            item.setTextAlignment(self.alignment)
+        return item
+
+
+def DIFF_ROWS(old: List[list], new: List[list], key: Callable[[list], Any] = None):
+    """
+    The changes turning the rows `old` into `new`, applied in order:
+        ("remove", index, count)
+        ("insert", index, rows)
+        ("update", index, columns, row)
+
+    Rows are matched by position, or by `key(row)` when given, in which case keys must
+    be unique and a row whose key moved is removed and inserted at its new position.
+    """
+    changes = []
+
+    def update(index: int, a: list, b: list):
+        if tuple(a) != tuple(b):
+            columns = [
+                column
+                for column, (x, y) in enumerate(itertools.zip_longest(a, b))
+                if x != y
+            ]
+            changes.append(("update", index, columns, b))
+
+    def remove(index: int):
+        last = changes[-1] if changes else None
+        if last and last[0] == "remove" and last[1] == index + 1:
+            changes[-1] = ("remove", index, last[2] + 1)
+        else:
+            changes.append(("remove", index, 1))
+
+    def insert(index: int, row: list):
+        last = changes[-1] if changes else None
+        if last and last[0] == "insert" and last[1] + len(last[2]) == index:
+            last[2].append(row)
+        else:
+            changes.append(("insert", index, [row]))
+
+    if key is None:
+        for index, (a, b) in enumerate(zip(old, new)):
+            update(index, a, b)
+
+        if len(old) > len(new):
+            changes.append(("remove", len(new), len(old) - len(new)))
+        elif len(new) > len(old):
+            changes.append(("insert", len(old), list(new[len(old) :])))
+
+        return changes
+
+    newKeys = [key(row) for row in new]
+    kept = set(newKeys)
+
+    rows = list(old)
+    keys = [key(row) for row in old]
+    for index in reversed(range(len(keys))):
+        if keys[index] not in kept:
+            remove(index)
+            del keys[index], rows[index]
+    present = set(keys)
+
+    for index, (k, row) in enumerate(zip(newKeys, new)):
+        if index < len(keys) and keys[index] == k:
+            update(index, rows[index], row)
+            continue
+
+        if k in present:
+            moved = keys.index(k, index)
+            remove(moved)
+            del keys[moved], rows[moved]
+
+        insert(index, row)
+        present.add(k)
+        keys.insert(index, k)
+        rows.insert(index, row)
+
+    return changes
+
+
+def SORT_KEY(value) -> tuple:
+    """
+    The sort key of a typed Qt.UserRole value: numbers, then dates, then strings in
+    the locale collation, then empty cells, so mixed columns still compare.
+    """
+    if value is None or value == "":
+        return (3, 0)
+    if isinstance(value, (numbers.Real, decimal.Decimal)):
+        return (0, value) if value == value else (3, 0)
+    if isinstance(value, datetime.datetime):
+        return (1, value.timestamp())
+    if isinstance(value, datetime.date):
+        return (1, datetime.datetime.combine(value, datetime.time()).timestamp())
+    if isinstance(value, QDateTime):
+        return (1, value.toMSecsSinceEpoch() / 1000)
+    if isinstance(value, QDate):
+        return (1, value.startOfDay().toMSecsSinceEpoch() / 1000)
+    return (2, locale.strxfrm(str(value)))
+
+
+class TableSorter:
+    """
+    The sort columns and filters of a table, with one array of precomputed SORT_KEYs
+    per sorted column so sorting and sorted insertions never convert a value twice.
+    `value(row, column)` and `count()` read the cells of the table.
+    """
+
+    def __init__(self, value: Callable[[int, int], Any], count: Callable[[], int]):
+        self.value = value
+        self.count = count
+
+        self.sortColumns: List[Tuple[int, Qt.SortOrder]] = []
+        self.filters: Dict[str, Callable[[list], bool]] = {}
+        self.keys: Dict[int, list] = {}
+
+    def setSortColumns(self, columns: list):
+        "`columns` are column indexes or (column, Qt.SortOrder), primary first."
+        self.sortColumns = [
+            column if isinstance(column, tuple) else (column, Qt.AscendingOrder)
+            for column in columns
+        ]
+
+        used = {column for column, _ in self.sortColumns}
+        for column in list(self.keys):
+            if column not in used:
+                del self.keys[column]
+
+    def setFilter(self, name: str, predicate: Callable[[list], bool]):
+        if predicate:
+            self.filters[name] = predicate
+        else:
+            self.filters.pop(name, None)
+
+    def accepts(self, row: list) -> bool:
+        return all(predicate(row) for predicate in self.filters.values())
+
+    def columnKeys(self, column: int) -> list:
+        keys = self.keys.get(column)
+        if keys is None:
+            value = self.value
+            keys = self.keys[column] = [
+                SORT_KEY(value(row, column)) for row in range(self.count())
+            ]
+        return keys
+
+    def invalidate(self):
+        self.keys.clear()
+
+    def insertKeys(self, index: int, count: int):
+        value = self.value
+        for column, keys in self.keys.items():
+            keys[index:index] = [
+                SORT_KEY(value(row, column)) for row in range(index, index + count)
+            ]
+
+    def removeKeys(self, index: int, count: int):
+        for keys in self.keys.values():
+            del keys[index : index + count]
+
+    def updateKeys(self, index: int, count: int = 1):
+        value = self.value
+        for column, keys in self.keys.items():
+            keys[index : index + count] = [
+                SORT_KEY(value(row, column)) for row in range(index, index + count)
+            ]
+
+    def permuteKeys(self, order: List[int]):
+        for keys in self.keys.values():
+            keys[:] = [keys[row] for row in order]
+
+    def sort(self, rows: List[int]) -> List[int]:
+        "Stable sorts the row indexes `rows` in place, a pass per sort column."
+        for column, order in reversed(self.sortColumns):
+            keys = self.columnKeys(column)
+            rows.sort(key=keys.__getitem__, reverse=order == Qt.DescendingOrder)
+        return rows
+
+    def rowKeys(self, row: list) -> list:
+        "The keys of a row not yet in the table, for position."
+        return [
+            SORT_KEY(row[column] if column < len(row) else None)
+            for column, _ in self.sortColumns
+        ]
+
+    def indexKeys(self, index: int) -> list:
+        "The keys of a row already in the table, for position."
+        return [self.columnKeys(column)[index] for column, _ in self.sortColumns]
+
+    def position(self, rows: Sequence[int], keys: list, index: int = None) -> int:
+        """
+        The index in the sorted row indexes `rows` where the row `index` with `keys`
+        belongs. Equal rows keep the order of their indexes like a stable sort, a new
+        row without index goes after its equals.
+        """
+        columns = [
+            (self.columnKeys(column), order == Qt.DescendingOrder)
+            for column, order in self.sortColumns
+        ]
+
+        low, high = 0, len(rows)
+        while low < high:
+            middle = (low + high) // 2
+            other = rows[middle]
+
+            before = index is not None and index < other
+            for key, (columnKeys, descending) in zip(keys, columns):
+                otherKey = columnKeys[other]
+                if key != otherKey:
+                    before = otherKey < key if descending else key < otherKey
+                    break
+
+            if before:
+                high = middle
+            else:
+                low = middle + 1
+
+        return low
+
+
+class TableColumnWidths(QObject):
+    """
+    Sizes the columns of a table from the header and a sample of the rows instead of
+    measuring every cell like QHeaderView.ResizeToContents: the first and last `edge`
+    rows, `sample` random rows and the `longest` texts.
+    Widths are cached per column, inserted rows can only widen a column and a column
+    is measured again only when its cells change.
+    """
+
+    def __init__(
+        self,
+        table: "TableDatas",
+        edge: int = 20,
+        sample: int = 50,
+        longest: int = 10,
+    ):
+        super().__init__(table)
+
+        self.table = table
+        self.edge = edge
+        self.sample = sample
+        self.longest = longest
+
+        self.widths: Dict[int, int] = {}
+        self.dirty: Set[int] = set()
+        self._changed: Set[int] = set()
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.apply)
+
+    def text(self, row: int, column: int) -> str:
+        value = self.table.value(row, column)
+        return str(value) if value else ""
+
+    def sampleRows(self, column: int, start: int, end: int) -> Iterable[int]:
+        edge = self.edge
+        if end - start <= 2 * edge + self.sample + self.longest:
+            return range(start, end)
+
+        rows = set(range(start, start + edge))
+        rows.update(range(end - edge, end))
+        rows.update(random.sample(range(start + edge, end - edge), self.sample))
+        rows.update(
+            heapq.nlargest(
+                self.longest,
+                range(start, end),
+                key=lambda row: len(self.text(row, column)),
+            )
+        )
+        return rows
+
+    def margin(self) -> int:
+        "The space around the text of a cell, as left by the delegate and the grid."
+        table = self.table
+        margin = table.style().pixelMetric(QStyle.PM_FocusFrameHMargin, None, table)
+        return 2 * (margin + 1) + table.showGrid()
+
+    def measureRows(self, column: int, rows: Iterable[int]) -> int:
+        table = self.table
+        style = table.columnStyles[column]
+        metrics = QFontMetrics(style.font or table.font())
+        boldMetrics = QFontMetrics(style.boldFont)
+        boldColumn = column in table.BOLD_COLUMNS
+
+        width = 0
+        for row in rows:
+            text = self.text(row, column)
+            if text:
+                bold = boldColumn or row in table.BOLD_ROWS
+                advance = (boldMetrics if bold else metrics).horizontalAdvance
+                width = max(width, *(advance(line) for line in text.split("\n")))
+
+        return width + self.margin() if width else 0
+
+    def measure(self, column: int) -> int:
+        table = self.table
+        style = table.columnStyles[column]
+        width = table.horizontalHeader().sectionSizeHint(column)
+
+        if style.splitter:
+            metrics = QFontMetrics(style.font or table.font())
+            text = metrics.horizontalAdvance(style.header.text) + self.margin()
+            return max(width, text)
+
+        rows = self.sampleRows(column, 0, table.rowDatasCount())
+        return max(width, self.measureRows(column, rows))
+
+    def invalidate(self, columns: Iterable[int] = None):
+        "Measures `columns`, or all of them, again on the next event loop pass."
+        if columns is None:
+            columns = range(len(self.table.columnStyles))
+        self.dirty.update(columns)
+        self._timer.start()
+
+    def grow(self, start: int, end: int):
+        "Widens the columns too narrow for the rows `start` to `end`."
+        for column, style in enumerate(self.table.columnStyles):
+            if style.splitter or column in self.dirty or column not in self.widths:
+                continue
+
+            width = self.measureRows(column, self.sampleRows(column, start, end))
+            if width > self.widths[column]:
+                self.widths[column] = width
+                self._changed.add(column)
+                self._timer.start()
+
+    def apply(self):
+        self._timer.stop()
+
+        for column in self.dirty:
+            width = self.measure(column)
+            if width != self.widths.get(column):
+                self.widths[column] = width
+                self._changed.add(column)
+        self.dirty.clear()
+
+        header = self.table.horizontalHeader()
+        for column in self._changed:
+            header.resizeSection(column, self.widths[column])
+        self._changed.clear()
+
+
+class TableStreamer(QObject):
+    """
+    Appends the rows of an iterator to a table in chunks from the event loop, either
+    `chunkSize` rows per tick or as many chunks as fit in `budget` milliseconds,
+    so the first rows show while the rest are still being produced.
+    """
+
+    progress = Signal(int)
+    finished = Signal(int)
+
+    def __init__(
+        self,
+        table: "TableDatas",
+        rows: Iterable[list],
+        chunkSize: int = 500,
+        budget: int = 0,
+    ):
+        super().__init__(table)
+
+        self.table = table
+        self.chunkSize = chunkSize
+        self.budget = budget
+        self.count = 0
+
+        self._rows = iter(rows)
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.tick)
+
+    def start(self) -> "TableStreamer":
+        self._timer.start()
+        return self
+
+    def cancel(self):
+        self._timer.stop()
+        # the rest of the rows are never read, let the iterator go
+        self._rows = iter(())
+
+    def isActive(self) -> bool:
+        return self._timer.isActive()
+
+    def tick(self):
+        start = time.perf_counter()
+
+        while True:
+            chunk = list(itertools.islice(self._rows, self.chunkSize))
+            if chunk:
+                self.table.appendRows(chunk)
+                self.count += len(chunk)
+
+            if len(chunk) < self.chunkSize:
+                self.cancel()
+                self.progress.emit(self.count)
+                self.finished.emit(self.count)
+                return
+
+            if (time.perf_counter() - start) * 1000 >= self.budget:
+                break
+
+        self.progress.emit(self.count)
+
+
+TABLE_BINARY_MAGIC = b"PRMPTBL\x01"
+
+
+def _EXPORT_TARGET(target, binary: bool):
+    "Opens `target` when it is a path, file objects are left open for the caller."
+    if isinstance(target, (str, os.PathLike)):
+        if binary:
+            return open(target, "wb")
+        return open(target, "w", newline="", encoding="utf-8")
+    return contextlib.nullcontext(target)
+
+
+def WRITE_TABLE_CSV(
+    target,
+    rows: Iterable[Sequence],
+    headers: List[str] = None,
+    delimiter: str = ",",
+    chunkSize: int = 1000,
+) -> int:
+    """
+    Writes `rows` as CSV, or TSV with `delimiter="\\t"`, to a path or text file a
+    chunk of rows at a time. Returns the count of rows written.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator="\n")
+    rows = iter(rows)
+    count = 0
+
+    with _EXPORT_TARGET(target, False) as file:
+        if headers:
+            writer.writerow(headers)
+
+        while True:
+            chunk = list(itertools.islice(rows, chunkSize))
+            writer.writerows(chunk)
+            count += len(chunk)
+
+            file.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+
+            if len(chunk) < chunkSize:
+                return count
+
+
+def _PACK_COLUMN(values: Sequence) -> Tuple[bytes, bytes]:
+    "The type tag and the bytes of a column of a chunk."
+    types = set(map(type, values))
+    if types == {type(None)}:
+        return b"n", b""
+
+    # explicit little endian standard sizes, array.array would use the native ones
+    if types == {int}:
+        try:
+            return b"q", struct.pack(f"<{len(values)}q", *values)
+        except struct.error:
+            pass
+
+    elif types <= {int, float} and all(
+        -(2**53) <= value <= 2**53 for value in values if type(value) is int
+    ):
+        return b"d", struct.pack(f"<{len(values)}d", *values)
+
+    texts = [b"" if value is None else str(value).encode("utf-8") for value in values]
+    lengths = struct.pack(f"<{len(texts)}I", *map(len, texts))
+    return b"s", lengths + b"".join(texts)
+
+
+def _UNPACK_COLUMN(tag: bytes, payload: bytes, count: int) -> Sequence:
+    if tag == b"n":
+        return [None] * count
+    if tag in (b"q", b"d"):
+        return list(struct.unpack(f"<{count}{tag.decode()}", payload))
+
+    lengths = struct.unpack(f"<{count}I", payload[: count * 4])
+    texts = []
+    offset = count * 4
+    for length in lengths:
+        texts.append(payload[offset : offset + length].decode("utf-8"))
+        offset += length
+    return texts
+
+
+def WRITE_TABLE_BINARY(
+    target, rows: Iterable[Sequence], headers: List[str], chunkSize: int = 4096
+) -> int:
+    """
+    Writes `rows` to a path or binary file in a compact column chunked format, read
+    back by READ_TABLE_BINARY. Returns the count of rows written.
+
+    Layout, little endian:
+        TABLE_BINARY_MAGIC, uint32 size + JSON list of the headers,
+        then per chunk uint32 rows count and per column a type tag byte, uint32 size
+        and the values: n (all None), q (int64), d (float64) or s (uint32 lengths then
+        UTF-8 texts), ended by a chunk of 0 rows.
+    """
+    rows = iter(rows)
+    count = 0
+
+    with _EXPORT_TARGET(target, True) as file:
+        head = json.dumps(list(headers)).encode("utf-8")
+        file.write(TABLE_BINARY_MAGIC + struct.pack("<I", len(head)) + head)
+
+        while True:
+            chunk = list(itertools.islice(rows, chunkSize))
+            parts = [struct.pack("<I", len(chunk))]
+
+            if chunk:
+                for values in zip(*chunk):
+                    tag, payload = _PACK_COLUMN(values)
+                    parts += [tag, struct.pack("<I", len(payload)), payload]
+                count += len(chunk)
+
+            file.write(b"".join(parts))
+
+            if not chunk:
+                return count
+
+
+def READ_TABLE_BINARY(source) -> Tuple[List[str], Iterator[tuple]]:
+    "The headers and an iterator of the rows written by WRITE_TABLE_BINARY."
+    file = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+
+    def read(size: int) -> bytes:
+        data = file.read(size)
+        if len(data) != size:
+            raise ValueError("Truncated table file.")
+        return data
+
+    if read(len(TABLE_BINARY_MAGIC)) != TABLE_BINARY_MAGIC:
+        raise ValueError("Not a table file.")
+
+    (size,) = struct.unpack("<I", read(4))
+    headers = json.loads(read(size).decode("utf-8"))
+
+    def rows():
+        try:
+            while True:
+                (count,) = struct.unpack("<I", read(4))
+                if not count:
+                    return
+
+                columns = []
+                for _ in headers:
+                    tag = read(1)
+                    (size,) = struct.unpack("<I", read(4))
+                    columns.append(_UNPACK_COLUMN(tag, read(size), count))
+                yield from zip(*columns)
+        finally:
+            if file is not source:
+                file.close()
+
+    return headers, rows()
+
+
+class TableDatas:
+    "The rows bookkeeping shared by Table and ModelTable."
+
+    _streamer: TableStreamer = None
+    _headerSorting = False
+    sorter: TableSorter = None
+    columnWidths: TableColumnWidths = None
+
+    SAMPLED_WIDTHS = True
+
+    def pad_row(self, row: List):
+        l = len(self.COLUMNS)
+        r = len(row)
+
+        if l > r:
+            for _ in range(l - r):
+                row.append(0)
+
+    def combineRows(self, datas: List[List], prefixes: List[List] = []) -> List[list]:
+        "Copies of the rows of `datas`, prefixed with `prefixes` and then padded."
+        if not prefixes:
+            return [list(data) for data in datas]
+
+        assert len(datas) == len(prefixes)
+
+        rows = []
+        for prefix, data in zip(prefixes, datas):
+            row = prefix + data
+            self.pad_row(row)
+            rows.append(row)
+        return rows
+
+    def updateTable(
+        self,
+        datas: List[List],
+        prefixes: List[List] = [],
+        key: Callable[[list], Any] = None,
+    ):
+        """
+        Updates the table to `datas` touching only the changed cells and the inserted or
+        removed rows, so selection and scroll position survive.
+        Rows are matched by index, or by `key(row)` when given.
+        """
+        rows = self.combineRows(datas, prefixes)
+        self.applyRowChanges(DIFF_ROWS(self.rowDatas(), rows, key))
+
+    def appendRows(self, datas: List[List], prefixes: List[List] = []):
+        rows = self.combineRows(datas, prefixes)
+        if rows:
+            self.applyRowChanges([("insert", self.rowDatasCount(), rows)])
+
+    def fillTableStream(
+        self, rows: Iterable[list], chunkSize: int = 500, budget: int = 0
+    ) -> TableStreamer:
+        """
+        Empties the table then appends `rows`, an iterator or generator, in chunks from
+        the event loop. The returned TableStreamer reports progress and can be cancelled.
+        """
+        self.fillTable([])
+        streamer = self._streamer = TableStreamer(self, rows, chunkSize, budget)
+        streamer.finished.connect(lambda _: self._releaseStream(streamer))
+        return streamer.start()
+
+    def cancelStream(self):
+        if self._streamer:
+            self._streamer.cancel()
+            self._releaseStream(self._streamer)
+
+    def _releaseStream(self, streamer: TableStreamer):
+        if self._streamer is streamer:
+            self._streamer = None
+        streamer.deleteLater()
+
+    def headerResizeMode(self) -> QHeaderView.ResizeMode:
+        "Sampled widths leave the columns resizable by the user."
+        if self.columnWidths:
+            return QHeaderView.ResizeMode.Interactive
+        return QHeaderView.ResizeMode.ResizeToContents
+
+    def sortByColumns(self, columns: list):
+        """
+        Stable sorts the rows on the typed Qt.UserRole values of `columns`, column
+        indexes or (column, Qt.SortOrder) pairs with the primary one first.
+        Rows added afterwards are inserted at their sorted position.
+        """
+        self.sorter.setSortColumns(columns)
+        self.applySort()
+
+        header = self.horizontalHeader()
+        if self._headerSorting and self.sorter.sortColumns:
+            header.setSortIndicator(*self.sorter.sortColumns[0])
+
+    def sortByColumn(self, column: int, order: Qt.SortOrder = Qt.AscendingOrder):
+        self.sortByColumns([(column, order)])
+
+    def setHeaderSorting(self, enabled: bool = True):
+        "Sorts by a column when its header is clicked."
+        if enabled == self._headerSorting:
+            return
+
+        header = self.horizontalHeader()
+        header.setSortIndicatorShown(enabled)
+        if enabled:
+            header.setSectionsClickable(True)
+            header.sortIndicatorChanged.connect(self._onSortIndicatorChanged)
+        else:
+            header.sortIndicatorChanged.disconnect(self._onSortIndicatorChanged)
+        self._headerSorting = enabled
+
+    def _onSortIndicatorChanged(self, column: int, order: Qt.SortOrder):
+        if self.sorter.sortColumns[:1] != [(column, order)]:
+            self.sortByColumns([(column, order)])
+
+    def setFilter(self, predicate: Callable[[list], bool], name: str = ""):
+        """
+        Hides the rows for which `predicate(row)` is false, `row` holding the typed
+        values. Filters of different `name`s are combined, None removes one.
+        """
+        self.sorter.setFilter(name, predicate)
+        self.applyFilter()
+
+    def clearFilters(self):
+        self.sorter.filters.clear()
+        self.applyFilter()
+
+    def applySort(self):
+        "Orders the rows by the sort columns of `sorter`."
+        ...
+
+    def applyFilter(self):
+        "Shows only the rows accepted by the filters of `sorter`."
+        ...
+
+    def rowDatas(self) -> List[list]:
+        "The rows currently in the table."
+        return []
+
+    def rowDatasCount(self) -> int:
+        return len(self.rowDatas())
+
+    def exportColumns(self) -> List[int]:
+        "The columns exported by default, all but the splitters."
+        return [
+            column
+            for column, header in enumerate(self.COLUMNS)
+            if header is not SPLITTER
+        ]
+
+    def iterRows(self, columns: List[int], visibleOnly: bool = True) -> Iterator[list]:
+        "The typed values of `columns` of each row, in the order shown."
+        accepts = self.sorter.accepts if visibleOnly and self.sorter.filters else None
+        for row in self.rowDatas():
+            if accepts is None or accepts(row):
+                yield [row[column] if column < len(row) else None for column in columns]
+
+    def exportTable(
+        self,
+        target,
+        format: str = "csv",
+        columns: List[int] = None,
+        headers: bool = True,
+        visibleOnly: bool = True,
+        chunkSize: int = 1000,
+    ) -> int:
+        """
+        Writes the rows to `target`, a path or a file object, straight from the datas of
+        the table: the typed Qt.UserRole values, not the texts of the cells.
+        `format` is "csv", "tsv" or "binary" (see WRITE_TABLE_BINARY), `columns`
+        default to all but the splitters and filtered rows are skipped with
+        `visibleOnly`. Returns the count of rows written.
+        """
+        if columns is None:
+            columns = self.exportColumns()
+
+        rows = self.iterRows(columns, visibleOnly)
+        names = [self.COLUMNS[column].text for column in columns]
+
+        if format == "binary":
+            return WRITE_TABLE_BINARY(target, rows, names, chunkSize)
+
+        assert format in ("csv", "tsv"), "format must be csv, tsv or binary"
+        return WRITE_TABLE_CSV(
+            target,
+            rows,
+            names if headers else None,
+            "\t" if format == "tsv" else ",",
+            chunkSize,
+        )
+
+    def applyRowChanges(self, changes: list[tuple]):
+        "Applies the `changes` from DIFF_ROWS to the table."
+        ...
+
+
+class Table(TableDatas, QTableWidget):
     COLUMNS: List[TableHeaderItem] = []
     BOLD_COLUMNS = []
     BOLD_ROWS = []
@@ -247,6 +1728,15 @@ class Table(QTableWidget):
     def __init__(self, verticalVisible=True, **kwargs):
         QTableWidget.__init__(self)
 
+        self.datas: List[list] = []
+        self.sorter = TableSorter(self.value, lambda: len(self.datas))
+        self._filtered = False
+        self.columnStyles = [TableColumnStyle(column) for column in self.COLUMNS]
+        if self.SAMPLED_WIDTHS:
+            self.columnWidths = TableColumnWidths(self)
+        self.emptyItem = QTableWidgetItem()
+        self.emptyItem.setFlags(Qt.NoItemFlags)
+
         self.setAlternatingRowColors(True)
         self.setWordWrap(True)
         self.setShowGrid(True)
@@ -280,94 +1770,219 @@ class Table(QTableWidget):
     def fillHeaders(self):
         self.clear()
 
-        self.horizontalHeader().setSectionResizeMode(
-            QHeaderView.ResizeMode.ResizeToContents
-        )
+        self.horizontalHeader().setSectionResizeMode(self.headerResizeMode())
 
         for index, headerItem in enumerate(self.COLUMNS):
 
             item = QTableWidgetItem()
             headerItem.updateItem(item)
-            font = item.font()
-            font.setBold(True)
-            font.setPointSize(12 if headerItem != SPLITTER else 8)
-            item.setFont(font)
+            item.setFont(self.columnStyles[index].headerFont)
 
             self.setHorizontalHeaderItem(index, item)
 
-    def pad_row(self, row: List):
-        l = len(self.COLUMNS)
-        r = len(row)
-
-        if l > r:
-            for _ in range(l - r):
-                row.append(0)
-
     def fillTable(self, datas: List[List], prefixes: List[List] = []):
         if prefixes:
             print(len(datas), len(prefixes))
             assert len(datas) == len(prefixes)
 
+        self.cancelStream()
         self.clearContents()
 
+        datas = self.datas = self.combineRows(datas, prefixes)
+
+        self.sorter.invalidate()
+        if self.sorter.sortColumns:
+            order = self.sorter.sort(list(range(len(datas))))
+            datas = self.datas = [datas[row] for row in order]
+            self.sorter.permuteKeys(order)
+
         l = len(datas)
         self.setRowCount(l if not self.INFINITE_ROWS else l + 10)
-        l = len(self.COLUMNS)
-
-        prefix = bool(prefixes)
 
         for row_index, data in enumerate(datas):
-            if prefix:
-                data = prefixes[row_index] + data
+            for column_index, value in enumerate(data):
+                item = self.createItem(row_index, column_index, value)
+                self.setItem(row_index, column_index, item)
+
+        self.fillSplitters()
+        self.applyFilter()
 
-                if len(data) < l:
-                    self.pad_row(data)
+        if self.columnWidths:
+            self.columnWidths.invalidate()
 
-            for column_index, value in enumerate(data):
-                item = QTableWidgetItem()
-                item.setData(Qt.UserRole, value)
-                if value:
-                    column_header = self.COLUMNS[column_index]
-
-                    dic = {}
-                    if column_header.colorItems:
-                        dic.update(
-                            foreground=column_header.itemsForeground,
-                            background=column_header.itemsBackground,
-                        )
-
-                    tableItem = TableItem(
-                        value,
-                        editable=column_header.editableColumns,
-                        **dic,
-                    )
-
-                    if (row_index in self.BOLD_ROWS) or (
-                        column_index in self.BOLD_COLUMNS
-                    ):
-                        font = item.font()
-                        font.setBold(True)
-                        font.setPointSize(12)
-                        item.setFont(font)
-                    tableItem.updateItem(item)
-                else:
-                    item.setFlags(Qt.NoItemFlags)
+    def createItem(self, row_index: int, column_index: int, value) -> QTableWidgetItem:
+        if value:
+            bold = (row_index in self.BOLD_ROWS) or (column_index in self.BOLD_COLUMNS)
+            item = QTableWidgetItem(self.columnStyles[column_index].prototype(bold))
+            item.setText(str(value))
+        else:
+            item = QTableWidgetItem(self.emptyItem)
 
+        item.setData(Qt.UserRole, value)
+        return item
+
+    def value(self, row: int, column: int):
+        data = self.datas[row]
+        return data[column] if column < len(data) else None
+
+    def rowDatas(self) -> List[list]:
+        return self.datas
+
+    def rowDatasCount(self) -> int:
+        return len(self.datas)
+
+    def appendRows(self, datas: List[List], prefixes: List[List] = []):
+        if not self.sorter.sortColumns:
+            return super().appendRows(datas, prefixes)
+
+        sorter = self.sorter
+        for row in self.combineRows(datas, prefixes):
+            index = sorter.position(range(len(self.datas)), sorter.rowKeys(row))
+            self.insertDatas(index, [row])
+
+    def applyRowChanges(self, changes: list[tuple]):
+        datas = self.datas
+        sorter = self.sorter
+        # inserted and updated rows, by identity as later changes shift indexes
+        changed = {}
+
+        for change, index, *args in changes:
+            if change == "remove":
+                del datas[index : index + args[0]]
+                sorter.removeKeys(index, args[0])
+                for _ in range(args[0]):
+                    self.removeRow(index)
+
+            elif change == "insert":
+                self.insertDatas(index, args[0])
+                changed.update((id(row), row) for row in args[0])
+
+            else:
+                columns, row = args
+                changed[id(row)] = row
+                datas[index] = row
+                sorter.updateKeys(index)
+                for column_index in columns:
+                    if column_index < len(row):
+                        value = row[column_index]
+                        item = self.createItem(index, column_index, value)
+                        self.setItem(index, column_index, item)
+                    else:
+                        self.takeItem(index, column_index)
+                if sorter.filters:
+                    self.setRowHidden(index, not sorter.accepts(row))
+                if self.columnWidths:
+                    self.columnWidths.invalidate(columns)
+
+        if changed and sorter.sortColumns:
+            self.placeRows(
+                [index for index, row in enumerate(datas) if id(row) in changed]
+            )
+
+    def insertDatas(self, index: int, rows: List[list]):
+        "Inserts the rows at `index`, keeping the sort keys and filters up to date."
+        self.datas[index:index] = rows
+        self.sorter.insertKeys(index, len(rows))
+
+        filters = self.sorter.filters
+        for row_index, row in enumerate(rows, index):
+            self.insertRow(row_index)
+            for column_index, value in enumerate(row):
+                item = self.createItem(row_index, column_index, value)
                 self.setItem(row_index, column_index, item)
+            self.fillSplitters(row_index, row_index + 1)
+            if filters:
+                self.setRowHidden(row_index, not self.sorter.accepts(row))
 
-        self.fillSplitters()
+        if self.columnWidths:
+            self.columnWidths.grow(index, index + len(rows))
+
+    def takeRow(self, index: int) -> list[QTableWidgetItem]:
+        "Removes the row at `index` and returns its items."
+        items = [self.takeItem(index, column) for column in range(self.columnCount())]
+        self.removeRow(index)
+        return items
 
-    def fillSplitters(self):
-        rows = self.rowCount()
-        for column_index, column in enumerate(self.COLUMNS):
-            if column == SPLITTER:
-                for row_index in range(rows):
-                    item = QTableWidgetItem()
-                    font = item.font()
-                    font.setPointSize(8)
-                    item.setFont(font)
-                    SPLITTER.updateItem(item)
+    def putRow(self, index: int, items: list[QTableWidgetItem]):
+        "Inserts a row of the `items` of takeRow at `index`."
+        self.insertRow(index)
+        for column, item in enumerate(items):
+            if item is not None:
+                self.setItem(index, column, item)
+
+    def placeRows(self, rows: List[int]):
+        """
+        Moves the rows at the indexes `rows` to their sorted position, reusing their
+        items. The other rows, their selection included, stay untouched. Nothing moves
+        while each of `rows` is still in order with its neighbours.
+        """
+        sorter = self.sorter
+        count = len(self.datas)
+
+        def inPlace(index: int) -> bool:
+            window = list(range(max(index - 1, 0), min(index + 2, count)))
+            return sorter.sort(list(window)) == window
+
+        if all(map(inPlace, rows)):
+            return
+
+        # where a stable sort puts them among the others, before anything moves
+        moved = set(rows)
+        others = [index for index in range(count) if index not in moved]
+        rows = sorter.sort(sorted(moved))
+        targets = [
+            sorter.position(others, sorter.indexKeys(row), row) + offset
+            for offset, row in enumerate(rows)
+        ]
+
+        taken = {}
+        for index in sorted(moved, reverse=True):
+            taken[index] = self.datas.pop(index), self.takeRow(index)
+            sorter.removeKeys(index, 1)
+
+        filters = sorter.filters
+        for index, target in zip(rows, targets):
+            row, items = taken[index]
+            self.datas.insert(target, row)
+            sorter.insertKeys(target, 1)
+            self.putRow(target, items)
+            if filters:
+                self.setRowHidden(target, not sorter.accepts(row))
+
+    def applySort(self):
+        order = self.sorter.sort(list(range(len(self.datas))))
+        if order == list(range(len(order))):
+            return
+
+        self.datas = [self.datas[row] for row in order]
+        self.sorter.permuteKeys(order)
+
+        # the items move with their rows instead of being created again
+        columns = range(self.columnCount())
+        items = [[self.takeItem(row, column) for column in columns] for row in order]
+        for row_index, row in enumerate(items):
+            for column_index, item in zip(columns, row):
+                if item is not None:
                     self.setItem(row_index, column_index, item)
+        self.applyFilter()
+
+    def applyFilter(self):
+        sorter = self.sorter
+        filtering = bool(sorter.filters)
+        if not (filtering or self._filtered):
+            return
+
+        for row_index, row in enumerate(self.datas):
+            self.setRowHidden(row_index, filtering and not sorter.accepts(row))
+        self._filtered = filtering
+
+    def fillSplitters(self, start: int = 0, end: int = None):
+        rows = self.rowCount() if end is None else end
+        for column_index, style in enumerate(self.columnStyles):
+            if style.splitter:
+                prototype = style.prototype()
+                for row_index in range(start, rows):
+                    self.setItem(row_index, column_index, QTableWidgetItem(prototype))
 
     def onCellActivated(self, row: int, column: int):
         ...
@@ -1,5 +1,5 @@
+import json
 from enum import Enum
-from PySide6.QtSvg import QSvgRenderer
 from .commons import *
 
 
@@ -10,18 +10,108 @@ class SvgCompositions(Enum):
     SourceAtop = QPainter.CompositionMode_SourceAtop
 
 
-def QSvgPixmap(
-    pixmap: QPixmap = None,
-    color: QColor = Qt.black,
+SVG_CACHE = PixmapCache(maxBytes=16 * 1024 * 1024)
+
+
+def SVG_KEY(
+    kind: str,
+    source: Union[str, QPixmap, QIcon],
+    size: QSize,
+    color: QColor,
+    composition: SvgCompositions,
+) -> tuple:
+    if isinstance(source, (QPixmap, QIcon)):
+        source = source.__class__.__name__, source.cacheKey()
+    else:
+        source = IMAGE_SOURCE_KEY(None, source)
+
+    if source is None:
+        return None
+
+    return (
+        kind,
+        source,
+        size.toTuple() if size else None,
+        QColor(color).rgba(),
+        composition,
+        DEVICE_PIXEL_RATIO(),
+    )
+
+
+def CLEAR_SVG_CACHE():
+    "Drops every cached tinted pixmap and icon, e.g. after a theme change."
+    SVG_CACHE.clear()
+
+
+def _CACHED_SVG(kind: str, build: Callable, cache: bool, *args):
+    key = SVG_KEY(kind, *args) if cache else None
+    if key is None:
+        return build(*args)
+
+    value = SVG_CACHE.get(key)
+    if value is None:
+        value = SVG_CACHE.put(key, build(*args))
+    return value
+
+
+def RENDER_SVG(
+    path: str,
+    size: QSize = None,
+    color: QColor = None,
     composition: SvgCompositions = SvgCompositions.SourceIn,
+) -> QImage:
+    """
+    Paints the svg at `path` directly at `size` scaled by the device pixel ratio,
+    tinting it with `color` in the same paint pass.
+    Returns None if `path` is not a valid svg.
+    """
+    from PySide6.QtSvg import QSvgRenderer
+
+    renderer = QSvgRenderer(path)
+    if not renderer.isValid():
+        return None
+
+    renderer.setAspectRatioMode(Qt.KeepAspectRatio)
+    size = size or renderer.defaultSize()
+    dpr = DEVICE_PIXEL_RATIO()
+
+    image = QImage(size * dpr, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing, True)
+    painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
+    renderer.render(painter, QRectF(image.rect()))
+    if color is not None:
+        painter.setCompositionMode(composition.value)
+        painter.fillRect(image.rect(), QColor(color))
+    painter.end()
+
+    image.setDevicePixelRatio(dpr)
+    return image
+
+
+def _TINT_PIXMAP(
+    pixmap: Union[QPixmap, str],
+    size: QSize,
+    color: QColor,
+    composition: SvgCompositions,
 ) -> QPixmap:
-    assert composition in SvgCompositions
+    if isinstance(pixmap, str):
+        image = RENDER_SVG(pixmap, size, color, composition)
+        if image is not None:
+            return QPixmap.fromImage(image)
+
     o = pixmap
-    if not isinstance(pixmap, QPixmap):
-        pixmap = QPixmap(pixmap)
+    # QPixmap is implicitly shared, painting on the copy leaves the original intact.
+    pixmap = QPixmap(pixmap)
 
     if pixmap.isNull():
         print(o)
+    elif size:
+        dpr = DEVICE_PIXEL_RATIO()
+        pixmap = pixmap.scaled(size * dpr, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        pixmap.setDevicePixelRatio(dpr)
 
     painter = QPainter(pixmap)
     painter.setCompositionMode(composition.value)
@@ -30,14 +120,207 @@ def QSvgPixmap(
     return pixmap
 
 
+def QSvgPixmap(
+    pixmap: QPixmap = None,
+    color: QColor = Qt.black,
+    composition: SvgCompositions = SvgCompositions.SourceIn,
+    size: QSize = None,
+    cache: bool = True,
+) -> QPixmap:
+    assert composition in SvgCompositions
+    return _CACHED_SVG("pixmap", _TINT_PIXMAP, cache, pixmap, size, color, composition)
+
+
 def QSvgIcon(
     icon: str = "",
     size: QSize = None,
     color: QColor = Qt.black,
     composition: SvgCompositions = SvgCompositions.SourceIn,
+    cache: bool = True,
 ) -> QIcon:
-    if isinstance(icon, QIcon):
-        icon = icon.pixmap(size)
+    assert composition in SvgCompositions
+
+    def build(icon, size, color, composition) -> QIcon:
+        if isinstance(icon, QIcon):
+            icon = icon.pixmap(size)
+            size = None
+
+        pixmap = QSvgPixmap(
+            pixmap=icon, color=color, composition=composition, size=size, cache=cache
+        )
+        return QIcon(pixmap)
+
+    return _CACHED_SVG("icon", build, cache, icon, size, color, composition)
+
+
+class QSvgAtlas:
+    """
+    A directory of svgs rasterized once into a single packed image, with an index of
+    icon name to rect stored in the image itself.
+    Icons are then sliced out of the atlas without touching the filesystem.
+
+    atlas = QSvgAtlas.loadOrBuild("icons.png", "icons/", size=24)
+    button.setIcon(atlas.icon("camera", color=Qt.darkBlue))
+    """
+
+    INDEX_KEY = "prmp_qt.atlas"
+
+    def __init__(self, image: QImage, index: dict[str, tuple], meta: dict = {}):
+        self.image = image
+        self.index = index
+        self.meta = meta
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def names(self) -> list[str]:
+        return list(self.index)
+
+    @staticmethod
+    def sources(directory: str) -> list[str]:
+        return sorted(
+            os.path.join(directory, file)
+            for file in os.listdir(directory)
+            if file.lower().endswith(".svg")
+        )
+
+    @staticmethod
+    def digest(paths: list[str]) -> str:
+        "Changes when an svg is added, removed, renamed or edited in place."
+        digest = hashlib.blake2b(digest_size=16)
+        for path in paths:
+            stat = os.stat(path)
+            digest.update(
+                repr((os.path.basename(path), stat.st_size, stat.st_mtime_ns)).encode()
+            )
+        return digest.hexdigest()
+
+    @classmethod
+    def build(cls, directory: str, size: int = 24, dpr: float = None) -> "QSvgAtlas":
+        from PySide6.QtSvg import QSvgRenderer
+
+        paths = cls.sources(directory)
+
+        dpr = dpr or DEVICE_PIXEL_RATIO()
+        cell = math.ceil(size * dpr)
+        columns = max(1, math.ceil(math.sqrt(len(paths))))
+        rows = max(1, math.ceil(len(paths) / columns))
+
+        image = QImage(columns * cell, rows * cell, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+
+        index = {}
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        for position, path in enumerate(paths):
+            renderer = QSvgRenderer(path)
+            if not renderer.isValid():
+                continue
+            renderer.setAspectRatioMode(Qt.KeepAspectRatio)
+
+            rect = QRect(
+                (position % columns) * cell, (position // columns) * cell, cell, cell
+            )
+            renderer.render(painter, QRectF(rect))
+
+            name = os.path.splitext(os.path.basename(path))[0]
+            index[name] = rect.getRect()
+        painter.end()
+
+        meta = dict(size=size, dpr=dpr, digest=cls.digest(paths))
+        return cls(image, index, meta)
+
+    def save(self, path: str) -> bool:
+        image = QImage(self.image)
+        image.setText(self.INDEX_KEY, json.dumps(dict(self.meta, icons=self.index)))
+        return image.save(path, "PNG")
+
+    @classmethod
+    def load(cls, path: str) -> "QSvgAtlas":
+        image = QImage(path)
+        data = image.text(cls.INDEX_KEY)
+        if image.isNull() or not data:
+            return None
+
+        meta = json.loads(data)
+        index = {name: tuple(rect) for name, rect in meta.pop("icons").items()}
+        return cls(image, index, meta)
+
+    @classmethod
+    def loadOrBuild(cls, path: str, directory: str, size: int = 24) -> "QSvgAtlas":
+        """
+        Loads the atlas at `path`, rebuilding and saving it if an svg of `directory`
+        changed since, or it was built for another size or device pixel ratio.
+        """
+        atlas = cls.load(path) if os.path.isfile(path) else None
+
+        if atlas and os.path.isdir(directory):
+            meta = atlas.meta
+            if (
+                meta.get("digest") != cls.digest(cls.sources(directory))
+                or meta.get("size") != size
+                or meta.get("dpr") != DEVICE_PIXEL_RATIO()
+            ):
+                atlas = None
+
+        if atlas is None:
+            atlas = cls.build(directory, size)
+            atlas.save(path)
+
+        return atlas
+
+    def _slice(self, name, size, color, composition) -> QPixmap:
+        dpr = self.meta.get("dpr", 1.0)
+        pixmap = QPixmap.fromImage(self.image.copy(QRect(*self.index[name])))
+
+        if size:
+            dpr = DEVICE_PIXEL_RATIO()
+            pixmap = pixmap.scaled(
+                size * dpr, Qt.KeepAspectRatio, Qt.SmoothTransformation
+            )
+        pixmap.setDevicePixelRatio(dpr)
+
+        if color is not None:
+            painter = QPainter(pixmap)
+            painter.setCompositionMode(composition.value)
+            painter.fillRect(pixmap.rect(), QColor(color))
+            painter.end()
+
+        return pixmap
+
+    def pixmap(
+        self,
+        name: str,
+        color: QColor = Qt.black,
+        composition: SvgCompositions = SvgCompositions.SourceIn,
+        size: QSize = None,
+        cache: bool = True,
+    ) -> QPixmap:
+        assert composition in SvgCompositions
+        if not cache:
+            return self._slice(name, size, color, composition)
+
+        key = (
+            "atlas",
+            self.image.cacheKey(),
+            name,
+            size.toTuple() if size else None,
+            None if color is None else QColor(color).rgba(),
+            composition,
+        )
+        value = SVG_CACHE.get(key)
+        if value is None:
+            value = SVG_CACHE.put(key, self._slice(name, size, color, composition))
+        return value
 
-    pixmap = QSvgPixmap(pixmap=icon, color=color, composition=composition)
-    return QIcon(pixmap)
+    def icon(
+        self,
+        name: str,
+        size: QSize = None,
+        color: QColor = Qt.black,
+        composition: SvgCompositions = SvgCompositions.SourceIn,
+    ) -> QIcon:
+        return QIcon(self.pixmap(name, color, composition, size))
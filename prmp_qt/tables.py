@@ -0,0 +1,544 @@
+import bisect, itertools
+from .scrollables import *
+
+
+class TableModel(QAbstractTableModel):
+    """
+    Serves the cells of a ModelTable lazily from column oriented arrays, deriving
+    texts, colors, fonts and flags from the COLUMNS, BOLD_ROWS and BOLD_COLUMNS
+    declarations of the table instead of creating an item per cell.
+    """
+
+    def __init__(self, table: "ModelTable"):
+        super().__init__(table)
+
+        self.columns: List[TableHeaderItem] = list(table.COLUMNS)
+        self.styles = [TableColumnStyle(column) for column in self.columns]
+        self.boldRows = set(table.BOLD_ROWS)
+        self.boldColumns = set(table.BOLD_COLUMNS)
+        self.infiniteRows = table.INFINITE_ROWS
+
+        self.datas: List[list] = [[] for _ in self.columns]
+        self.rows = 0
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return self.rows + 10 if self.infiniteRows else self.rows
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.columns)
+
+    def setDatas(self, datas: List[list]):
+        "Replaces every row, `datas` is a list of rows."
+        self.beginResetModel()
+
+        count = len(self.columns)
+        columns = itertools.zip_longest(*datas) if datas else ()
+        self.datas = [list(column) for column in itertools.islice(columns, count)]
+        self.datas.extend([None] * len(datas) for _ in range(count - len(self.datas)))
+        self.rows = len(datas)
+
+        self.endResetModel()
+
+    def applyRowChanges(self, changes: list[tuple]):
+        "Applies the changes from DIFF_ROWS with the minimal change notifications."
+        root = QModelIndex()
+        count = len(self.columns)
+        cell = lambda row, column: row[column] if column < len(row) else None
+
+        for change, index, *args in changes:
+            if change == "remove":
+                removed = args[0]
+                self.beginRemoveRows(root, index, index + removed - 1)
+                for column in self.datas:
+                    del column[index : index + removed]
+                self.rows -= removed
+                self.endRemoveRows()
+
+            elif change == "insert":
+                rows = args[0]
+                self.beginInsertRows(root, index, index + len(rows) - 1)
+                for column_index, column in enumerate(self.datas):
+                    column[index:index] = [cell(row, column_index) for row in rows]
+                self.rows += len(rows)
+                self.endInsertRows()
+
+            else:
+                columns, row = args
+                columns = [column for column in columns if column < count]
+                if not columns:
+                    continue
+
+                for column in columns:
+                    self.datas[column][index] = cell(row, column)
+                self.dataChanged.emit(
+                    self.index(index, min(columns)), self.index(index, max(columns))
+                )
+
+    def value(self, row: int, column: int):
+        if row < self.rows:
+            return self.datas[column][row]
+
+    def row(self, row: int) -> list:
+        return [column[row] for column in self.datas]
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        return self.cellData(index.row(), index.column(), role)
+
+    def cellData(self, row: int, column: int, role: int = Qt.DisplayRole):
+        if row >= self.rows:
+            return None
+
+        style = self.styles[column]
+        if style.splitter:
+            if role == Qt.DisplayRole:
+                return style.header.text
+            if role == Qt.FontRole:
+                return style.font
+            if role == Qt.TextAlignmentRole:
+                return style.alignment
+            return None
+
+        value = self.datas[column][row]
+        if role == Qt.UserRole:
+            return value
+        if not value:
+            return None
+
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return str(value)
+        if role == Qt.TextAlignmentRole:
+            return style.alignment
+        if role == Qt.FontRole:
+            if row in self.boldRows or column in self.boldColumns:
+                return style.boldFont
+        elif role == Qt.ForegroundRole:
+            return style.foreground
+        elif role == Qt.BackgroundRole:
+            return style.background
+
+        return None
+
+    def setData(self, index: QModelIndex, value, role: int = Qt.EditRole) -> bool:
+        if role not in (Qt.EditRole, Qt.UserRole) or index.row() >= self.rows:
+            return False
+
+        self.datas[index.column()][index.row()] = value
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        return self.cellFlags(index.row(), index.column())
+
+    def cellFlags(self, row: int, column: int) -> Qt.ItemFlags:
+        if not self.value(row, column):
+            return Qt.NoItemFlags
+        return self.styles[column].flags
+
+    def headerData(
+        self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole
+    ):
+        if orientation != Qt.Horizontal:
+            return super().headerData(section, orientation, role)
+
+        header = self.columns[section]
+        if role == Qt.DisplayRole:
+            return header.text
+        if role == Qt.FontRole:
+            return self.styles[section].headerFont
+        if role == Qt.ForegroundRole:
+            return header.foreground
+        if role == Qt.BackgroundRole:
+            return header.background
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+
+        return None
+
+
+class TableProxyModel(QAbstractProxyModel):
+    """
+    Sorts and filters the rows of a TableModel with a TableSorter.
+    `order` holds the model rows shown by the view, a range until a sort or a filter
+    is applied. Rows inserted or changed in the model are moved to their sorted
+    position without sorting the others again.
+    """
+
+    def __init__(self, model: TableModel):
+        super().__init__(model)
+
+        self.source = model
+        self.sorter = TableSorter(model.value, lambda: model.rows)
+        self.order: Sequence[int] = range(model.rows)
+        self._positions: Dict[int, int] = None
+
+        self.setSourceModel(model)
+
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self._onModelReset)
+        model.rowsInserted.connect(self._onRowsInserted)
+        model.rowsRemoved.connect(self._onRowsRemoved)
+        model.dataChanged.connect(self._onDataChanged)
+
+    def index(
+        self, row: int, column: int, parent: QModelIndex = QModelIndex()
+    ) -> QModelIndex:
+        if parent.isValid() or not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index: QModelIndex = None):
+        if index is None:
+            return super().parent()
+        return QModelIndex()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.order) + self.source.rowCount() - self.source.rows
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return self.source.columnCount(parent)
+
+    def sourceRow(self, row: int) -> int:
+        order = self.order
+        if row < len(order):
+            return order[row]
+        return self.source.rows + row - len(order)
+
+    def proxyRow(self, row: int) -> int:
+        "The view row of the model `row`, -1 if filtered out."
+        order = self.order
+        if row >= self.source.rows:
+            return len(order) + row - self.source.rows
+        if isinstance(order, range):
+            return row if row < len(order) else -1
+
+        if self._positions is None:
+            self._positions = {row: position for position, row in enumerate(order)}
+        return self._positions.get(row, -1)
+
+    def mapToSource(self, index: QModelIndex) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        return self.source.index(self.sourceRow(index.row()), index.column())
+
+    def mapFromSource(self, index: QModelIndex) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        row = self.proxyRow(index.row())
+        return self.index(row, index.column()) if row >= 0 else QModelIndex()
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        row = index.row()
+        order = self.order
+        if row >= len(order) or order[row] < 0:
+            return None
+        return self.source.cellData(order[row], index.column(), role)
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        row = index.row()
+        order = self.order
+        if row >= len(order) or order[row] < 0:
+            return Qt.NoItemFlags
+        return self.source.cellFlags(order[row], index.column())
+
+    def headerData(
+        self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole
+    ):
+        if orientation == Qt.Horizontal:
+            return self.source.headerData(section, orientation, role)
+        return super().headerData(section, orientation, role)
+
+    def sortRows(self):
+        "Applies the sort columns of the sorter, keeping the selection."
+        self.layoutAboutToBeChanged.emit()
+
+        persistent = self.persistentIndexList()
+        sources = [self.mapToSource(index) for index in persistent]
+        self._rebuild()
+        self.changePersistentIndexList(
+            persistent, [self.mapFromSource(index) for index in sources]
+        )
+
+        self.layoutChanged.emit()
+
+    def filterRows(self):
+        "Applies the filters of the sorter."
+        self.beginResetModel()
+        self._rebuild()
+        self.endResetModel()
+
+    def _rebuild(self):
+        model = self.source
+        sorter = self.sorter
+        self._positions = None
+
+        if not (sorter.sortColumns or sorter.filters):
+            self.order = range(model.rows)
+            return
+
+        rows = range(model.rows)
+        if sorter.filters:
+            rows = [row for row in rows if sorter.accepts(model.row(row))]
+        self.order = sorter.sort(list(rows))
+
+    def _placeRows(self, rows: Iterable[int]):
+        "Inserts the model `rows` at their sorted position, as few blocks as possible."
+        sorter = self.sorter
+        if sorter.filters:
+            rows = [row for row in rows if sorter.accepts(self.source.row(row))]
+        rows = sorter.sort(list(rows))
+
+        if sorter.sortColumns:
+            where = lambda row: sorter.position(self.order, sorter.indexKeys(row), row)
+        else:
+            where = lambda row: bisect.bisect_left(self.order, row)
+
+        root = QModelIndex()
+        start = 0
+        while start < len(rows):
+            position = where(rows[start])
+            end = start + 1
+            while end < len(rows) and where(rows[end]) == position:
+                end += 1
+
+            self.beginInsertRows(root, position, position + end - start - 1)
+            self.order[position:position] = rows[start:end]
+            self._positions = None
+            self.endInsertRows()
+
+            start = end
+
+    def _dropRows(self):
+        "Removes the rows marked -1 in `order`, a block at a time from the end."
+        order = self.order
+        root = QModelIndex()
+
+        end = len(order)
+        while end:
+            if order[end - 1] != -1:
+                end -= 1
+                continue
+
+            start = end - 1
+            while start and order[start - 1] == -1:
+                start -= 1
+
+            self.beginRemoveRows(root, start, end - 1)
+            del order[start:end]
+            self._positions = None
+            self.endRemoveRows()
+
+            end = start
+
+    def _onModelReset(self):
+        self.sorter.invalidate()
+        self._rebuild()
+        self.endResetModel()
+
+    def _onRowsInserted(self, parent: QModelIndex, first: int, last: int):
+        count = last - first + 1
+        self.sorter.insertKeys(first, count)
+        self._positions = None
+
+        if isinstance(self.order, range):
+            self.beginInsertRows(QModelIndex(), first, last)
+            self.order = range(len(self.order) + count)
+            self.endInsertRows()
+            return
+
+        if first < self.source.rows - count:
+            self.order = [row + count if row >= first else row for row in self.order]
+        self._placeRows(range(first, last + 1))
+
+    def _onRowsRemoved(self, parent: QModelIndex, first: int, last: int):
+        count = last - first + 1
+        self.sorter.removeKeys(first, count)
+        self._positions = None
+
+        if isinstance(self.order, range):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self.order = range(len(self.order) - count)
+            self.endRemoveRows()
+            return
+
+        self.order = [
+            row - count if row > last else -1 if row >= first else row
+            for row in self.order
+        ]
+        self._dropRows()
+
+    def _onDataChanged(
+        self, topLeft: QModelIndex, bottomRight: QModelIndex, roles: list = []
+    ):
+        first, last = topLeft.row(), bottomRight.row()
+        left, right = topLeft.column(), bottomRight.column()
+        self.sorter.updateKeys(first, last - first + 1)
+
+        if isinstance(self.order, range):
+            self.dataChanged.emit(
+                self.index(first, left), self.index(last, right), roles
+            )
+            return
+
+        sorter = self.sorter
+        if sorter.filters or any(left <= c <= right for c, _ in sorter.sortColumns):
+            self.order = [-1 if first <= row <= last else row for row in self.order]
+            self._dropRows()
+            self._placeRows(range(first, last + 1))
+            return
+
+        for row in range(first, last + 1):
+            row = self.proxyRow(row)
+            if row >= 0:
+                self.dataChanged.emit(
+                    self.index(row, left), self.index(row, right), roles
+                )
+
+
+class ModelTable(TableDatas, QTableView):
+    """
+    A Table backed by a TableModel, for large datas.
+    Subclasses declare COLUMNS, BOLD_COLUMNS, BOLD_ROWS and INFINITE_ROWS, and call
+    fillTable, exactly like Table.
+    The per cell hooks (onCellClicked, ...) are called with the row of the model and
+    the column, the per item hooks of Table have no equivalent.
+    Sorting and filtering go through `proxyModel`, a TableProxyModel.
+    """
+
+    COLUMNS: List[TableHeaderItem] = []
+    BOLD_COLUMNS = []
+    BOLD_ROWS = []
+    INFINITE_ROWS = False
+
+    def __init__(self, verticalVisible=True, **kwargs):
+        QTableView.__init__(self)
+
+        self.tableModel = TableModel(self)
+        self.proxyModel = TableProxyModel(self.tableModel)
+        self.sorter = self.proxyModel.sorter
+        self.columnStyles = self.tableModel.styles
+        self.setModel(self.proxyModel)
+
+        if self.SAMPLED_WIDTHS:
+            self.columnWidths = TableColumnWidths(self)
+            self.tableModel.modelReset.connect(lambda: self.columnWidths.invalidate())
+            self.tableModel.rowsInserted.connect(
+                lambda parent, first, last: self.columnWidths.grow(first, last + 1)
+            )
+            self.tableModel.dataChanged.connect(
+                lambda topLeft, bottomRight, *_: self.columnWidths.invalidate(
+                    range(topLeft.column(), bottomRight.column() + 1)
+                )
+            )
+
+        self.setAlternatingRowColors(True)
+        self.setWordWrap(True)
+        self.setShowGrid(True)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectColumns)
+
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+
+        self.fillHeaders()
+
+        self.verticalHeader().setVisible(verticalVisible)
+
+        row = lambda index: (
+            self.proxyModel.sourceRow(index.row()) if index.isValid() else -1
+        )
+        cell = lambda callback: lambda index: callback(row(index), index.column())
+
+        self.activated.connect(cell(self.onCellActivated))
+        self.clicked.connect(cell(self.onCellClicked))
+        self.doubleClicked.connect(cell(self.onCellDoubleClicked))
+        self.entered.connect(cell(self.onCellEntered))
+        self.pressed.connect(cell(self.onCellPressed))
+        self.tableModel.dataChanged.connect(
+            lambda topLeft, *_: self.onCellChanged(topLeft.row(), topLeft.column())
+        )
+        self.selectionModel().currentChanged.connect(
+            lambda current, previous: self.onCurrentCellChanged(
+                row(current), current.column(), row(previous), previous.column()
+            )
+        )
+        self.selectionModel().selectionChanged.connect(
+            lambda *_: self.onItemSelectionChanged()
+        )
+
+    def fillHeaders(self):
+        self.horizontalHeader().setSectionResizeMode(self.headerResizeMode())
+
+    def fillTable(self, datas: List[List], prefixes: List[List] = []):
+        self.cancelStream()
+        self.tableModel.setDatas(self.combineRows(datas, prefixes))
+
+    def value(self, row: int, column: int):
+        return self.tableModel.value(row, column)
+
+    def rowDatas(self) -> List[list]:
+        return list(zip(*self.tableModel.datas))
+
+    def rowDatasCount(self) -> int:
+        return self.tableModel.rows
+
+    def iterRows(self, columns: List[int], visibleOnly: bool = True) -> Iterator[list]:
+        datas = [self.tableModel.datas[column] for column in columns]
+        rows, sorter = self.tableModel.rows, self.proxyModel.sorter
+        if visibleOnly:
+            order = self.proxyModel.order
+        elif sorter.sortColumns:
+            # filtered out rows too, still in the order shown
+            order = sorter.sort(list(range(rows)))
+        else:
+            order = range(rows)
+
+        if isinstance(order, range):
+            return zip(*datas)
+        return ([column[row] for column in datas] for row in order)
+
+    def applyRowChanges(self, changes: list[tuple]):
+        self.tableModel.applyRowChanges(changes)
+
+    def applySort(self):
+        self.proxyModel.sortRows()
+
+    def applyFilter(self):
+        self.proxyModel.filterRows()
+
+    def fillSplitters(self):
+        "Splitter cells are served by the model, kept for the Table API."
+
+    def onCellActivated(self, row: int, column: int):
+        ...
+
+    def onCellChanged(self, row: int, column: int):
+        ...
+
+    def onCellClicked(self, row: int, column: int):
+        ...
+
+    def onCellDoubleClicked(self, row: int, column: int):
+        ...
+
+    def onCellEntered(self, row: int, column: int):
+        ...
+
+    def onCellPressed(self, row: int, column: int):
+        ...
+
+    def onCurrentCellChanged(
+        self,
+        currentRow: int,
+        currentColumn: int,
+        previousRow: int,
+        previousColumn: int,
+    ):
+        ...
+
+    def onItemSelectionChanged(self):
+        ...
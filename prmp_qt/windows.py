@@ -1,4 +1,3 @@
-from turtle import right
 from .labels import *
 from .frames import VFrame, HFrame
 
@@ -162,6 +161,12 @@ class BaseWindow_:
     resized = Signal()
     moved = Signal()
 
+    def __init__(self):
+        # windows open in the current theme, before any child is polished
+        theme = getattr(QApplication.instance(), "theme", None)
+        if theme:
+            self.setProperty(THEME_PROPERTY, theme)
+
     def moveEvent(self, _: QMoveEvent) -> None:
         self.moved.emit()
 
@@ -316,8 +321,8 @@ class PrmpWindow(RoundWindow):
     def event(self, event: QEvent):
         type = event.type()
 
-        if type in [event.Enter, event.MouseMove, event.Leave]:
-            if type != event.Leave:
+        if type in [QEvent.Enter, QEvent.MouseMove, QEvent.Leave]:
+            if type != QEvent.Leave:
                 m = self.titleBar.height()
                 w, h = self.width(), self.height()
                 x, y = event.pos().toTuple()
@@ -3,6 +3,7 @@ import site
 site.addsitedir("../")
 
 from prmp_qt import *
+from prmp_qt.media import *
 
 
 class App(QApplication):
@@ -0,0 +1,40 @@
+import site, tempfile
+
+site.addsitedir("../")
+
+from prmp_qt import *
+
+with tempfile.NamedTemporaryFile("w", suffix=".svg", delete=False) as file:
+    file.write(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24">'
+        '<circle cx="12" cy="12" r="10"/></svg>'
+    )
+    SVG = file.name
+
+
+class App(QApplication):
+    def __init__(self):
+        super().__init__()
+
+        self.w = QWidget()
+        lay = QHBoxLayout(self.w)
+
+        # Icon stores iconSize as an int on IconButton, both must still work
+        for color in [Qt.black, Qt.red, Qt.blue]:
+            button = IconButton(SVG, 24, color=color)
+            button.setIcon(SVG, Qt.darkGreen)
+            button.setIconColor(color)
+            assert not button.icon().isNull()
+            lay.addWidget(button)
+
+        # without iconSize the icon keeps the default QPushButton size
+        button = Button(icon=SVG)
+        button.setIconColor(Qt.red)
+        assert not button.icon().isNull()
+        lay.addWidget(button)
+
+        self.w.show()
+
+
+a = App()
+a.exec()
@@ -0,0 +1,112 @@
+"""
+Reports the import time and resident memory of prmp_qt and each of its submodules.
+
+Submodules are imported one after another in a fresh interpreter with the
+package __init__ bypassed, so each row is what that submodule adds on top of the
+rows above it. The last rows import the package itself the way apps do.
+
+    python import_benchmark.py [repeats]
+"""
+
+import json, os, statistics, subprocess, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SUBMODULES = [
+    "PySide6.QtWidgets",
+    "prmp_qt.qss",
+    "prmp_qt.commons",
+    "prmp_qt.svgs",
+    "prmp_qt.labels",
+    "prmp_qt.buttons",
+    "prmp_qt.frames",
+    "prmp_qt.editors",
+    "prmp_qt.radiobuttons",
+    "prmp_qt.windows",
+    "prmp_qt.scrollables",
+    "prmp_qt.tables",
+    "PySide6.QtSvg",
+    "prmp_qt.media",
+]
+
+PACKAGE = ["prmp_qt", "prmp_qt.media"]
+
+PROBE = """
+import importlib, json, os, sys, time, types
+
+def RSS():
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        import resource
+
+        # peak rss, in kilobytes on linux and bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    except ImportError:
+        return None
+
+bypass, modules = sys.argv[1] == "bypass", sys.argv[2:]
+if bypass:
+    package = types.ModuleType("prmp_qt")
+    package.__path__ = [os.path.join(os.getcwd(), "prmp_qt")]
+    sys.modules["prmp_qt"] = package
+
+rows = []
+for module in modules:
+    before, start = RSS(), time.perf_counter()
+    try:
+        importlib.import_module(module)
+    except Exception as error:
+        rows.append(dict(module=module, error=repr(error)))
+        continue
+    elapsed, after = time.perf_counter() - start, RSS()
+    rows.append(dict(
+        module=module,
+        time=elapsed * 1000,
+        rss=None if before is None else (after - before) / 2**20,
+        qt=sorted(name[8:] for name in sys.modules if name.startswith("PySide6.Qt")),
+    ))
+
+print(json.dumps(rows))
+"""
+
+
+def MEASURE(modules: list, bypass: bool) -> list:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, "bypass" if bypass else "package", *modules],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if output.returncode:
+        raise RuntimeError(output.stderr)
+    return json.loads(output.stdout.splitlines()[-1])
+
+
+def REPORT(modules: list, bypass: bool, repeats: int):
+    runs = list(zip(*(MEASURE(modules, bypass) for _ in range(repeats))))
+    for rows in runs:
+        row = rows[-1]
+        if "error" in row:
+            print(f"{row['module']:24} {row['error']}")
+            continue
+
+        elapsed = statistics.median(row["time"] for row in rows)
+        rss = "-" if row["rss"] is None else f"{row['rss']:.1f}"
+        print(f"{row['module']:24} {elapsed:10.1f} {rss:>8}  {', '.join(row['qt'])}")
+
+
+def main(repeats: int = 5):
+    print(f"{'module':24} {'import ms':>10} {'rss MiB':>8}  Qt modules loaded")
+    REPORT(SUBMODULES, True, repeats)
+    print()
+    REPORT(PACKAGE, False, repeats)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))